@@ -0,0 +1,393 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from injection import NullMouseMover
+from idle import add_idle_arguments, idle_from_args
+from roi import add_roi_arguments, roi_from_args
+from flow import add_flow_arguments, flow_from_args
+from filters import FILTERS, add_filter_arguments, filter_from_args, make_filter, score_filter
+from pipeline import add_pipeline_arguments, run_pipeline
+from traces import add_trace_arguments, settings_from_args, trace_from_args
+from tracking import HandTracking
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+class ImageSequence:
+    def __init__(self, directory: str, fps: float = 30.0):
+        self.paths = sorted(path for path in glob.glob(os.path.join(directory, '*'))
+                            if path.lower().endswith(IMAGE_EXTENSIONS))
+        self.position = 0
+        self.fps = fps
+
+    def read(self, image=None):
+        if self.position >= len(self.paths):
+            return False, None
+        image = cv2.imread(self.paths[self.position])
+        self.position += 1
+        return image is not None, image
+
+    def grab(self):
+        if self.position >= len(self.paths):
+            return False
+        self.position += 1
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.paths)
+        return 0
+
+    def set(self, prop, value):
+        return False
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def release(self):
+        pass
+
+class SimulatedLighting:
+    def __init__(self, cap, dim: float = 0.35, period: int = 300):
+        self.cap = cap
+        self.dim = dim
+        self.period = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or period
+        self.position = 0
+        self.properties = {cv2.CAP_PROP_BRIGHTNESS: 128.0, cv2.CAP_PROP_CONTRAST: 128.0}
+
+    def light(self) -> float:
+        phase = self.position * 3 // self.period % 3
+        return self.dim if phase == 1 else 1.0
+
+    def read(self, image=None):
+        success, image = self.cap.read(image)
+        if success:
+            self.position += 1
+            alpha = self.light() * self.properties[cv2.CAP_PROP_CONTRAST] / 128
+            cv2.convertScaleAbs(image, dst=image, alpha=alpha, beta=self.properties[cv2.CAP_PROP_BRIGHTNESS] - 128)
+        return success, image
+
+    def grab(self):
+        self.position += 1
+        return self.cap.grab()
+
+    def get(self, prop):
+        if prop in self.properties:
+            return self.properties[prop]
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        if prop in self.properties:
+            self.properties[prop] = float(value)
+            return True
+        return self.cap.set(prop, value)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+def open_source(source):
+    if os.path.isdir(source):
+        return ImageSequence(source)
+    return cv2.VideoCapture(source)
+
+class ReplayTracking(HandTracking):
+    def open_camera(self, source):
+        return open_source(source)
+
+    def create_mouse_mover(self):
+        return NullMouseMover()
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2 ** 20 if sys.platform == 'darwin' else rss / 1024
+
+def replay(tracker: ReplayTracking, max_frames: int = 0, warmup: int = 5, draw: bool = False,
+           keep_landmarks: bool = False, track_memory: bool = False):
+    fps = tracker.cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = 0
+    start = None
+    timestamps = []
+    raw_track = []
+    cpu = {'active': 0.0, 'idle': 0.0}
+    video_frames = {'active': 0, 'idle': 0}
+    wake_frame = None
+    wake_latencies = []
+    landmarks = {}
+    frame_size = None
+    buffer = None
+    allocated = []
+    luminance = []
+    rss_start = None
+
+    while not max_frames or frames < max_frames + warmup:
+        state = 'idle' if tracker.idle is not None and tracker.idle.active else 'active'
+        if frames == warmup:
+            tracker.stats.reset()
+            start = time.perf_counter()
+            if track_memory:
+                rss_start = peak_rss_mb()
+                tracemalloc.start()
+        cpu_start = time.process_time()
+        if frames >= warmup and tracker.capture.stride > 1 and frames % tracker.capture.stride:
+            if not tracker.cap.grab():
+                break
+            cpu[state] += time.process_time() - cpu_start
+            video_frames[state] += 1
+            frames += 1
+            continue
+
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            traced, _ = tracemalloc.get_traced_memory()
+
+        decode_start = time.perf_counter()
+        success, image = tracker.cap.read(buffer)
+        if not success:
+            break
+        if tracker.pool is not None:
+            buffer = image
+        tracker.stats.add('decode', time.perf_counter() - decode_start)
+        frame_size = image.shape[1::-1]
+        if tracker.exposure is not None:
+            with tracker.stats.time('exposure'):
+                tracker.exposure.update(tracker.cap, image)
+            if tracker.exposure.luminance is not None and frames >= warmup:
+                luminance.append(tracker.exposure.luminance)
+
+        processed = tracker.step(image, frames / fps, draw=draw)
+        if tracemalloc.is_tracing():
+            allocated.append(tracemalloc.get_traced_memory()[1] - traced)
+        if frames >= warmup:
+            cpu[state] += time.process_time() - cpu_start
+            video_frames[state] += 1
+            if state == 'idle' and processed is not None:
+                wake_frame = frames
+            if processed is not None and processed[1].multi_hand_landmarks:
+                if keep_landmarks:
+                    landmarks[frames] = np.array([(landmark.x, landmark.y, landmark.z)
+                                                  for landmark in processed[1].multi_hand_landmarks[0].landmark])
+                timestamps.append(frames / fps)
+                raw_track.append(tracker.raw_cursor)
+                if wake_frame is not None:
+                    wake_latencies.append((frames - wake_frame) / fps * 1000)
+                    wake_frame = None
+        frames += 1
+
+    measured = max(frames - warmup, 0)
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+    summary = tracker.stats.summary()
+    memory = None
+    if track_memory:
+        tracemalloc.stop()
+        rss_end = peak_rss_mb()
+        memory = {
+            'allocated_kb_per_frame': float(np.mean(allocated)) / 1024 if allocated else 0.0,
+            'allocated_kb_max': float(np.max(allocated)) / 1024 if allocated else 0.0,
+            'peak_rss_mb': rss_end,
+            'peak_rss_growth_mb': rss_end - rss_start if rss_end is not None else None,
+        }
+    return {
+        'frames': measured,
+        'fps': measured / elapsed if elapsed > 0 else 0.0,
+        'detection_rate': summary['detection_rate'],
+        'injected_events': tracker.mouse_mover.backend.events_sent,
+        'stages': summary['stages'],
+        'idle': {
+            'idle_fraction': video_frames['idle'] / measured if measured else 0.0,
+            'idle_cpu_percent': cpu['idle'] / (video_frames['idle'] / fps) * 100 if video_frames['idle'] else 0.0,
+            'active_cpu_percent': cpu['active'] / (video_frames['active'] / fps) * 100 if video_frames['active'] else 0.0,
+            'wakeups': summary['counters'].get('idle_wake', 0),
+            'wake_latency_ms': float(np.mean(wake_latencies)) if wake_latencies else None,
+            'wake_latency_max_ms': float(np.max(wake_latencies)) if wake_latencies else None,
+        },
+        'timestamps': timestamps,
+        'raw_track': raw_track,
+        'landmarks': landmarks,
+        'frame_size': frame_size,
+        'memory': memory,
+        'exposure': exposure_report(tracker.exposure, luminance) if tracker.exposure is not None else None,
+    }
+
+def exposure_report(exposure, luminance):
+    properties = exposure.properties or {}
+    return {
+        'adjustments': exposure.adjustments,
+        'luminance_mean': float(np.mean(luminance)) if luminance else None,
+        'luminance_min': float(np.min(luminance)) if luminance else None,
+        'brightness': properties.get(cv2.CAP_PROP_BRIGHTNESS),
+        'contrast': properties.get(cv2.CAP_PROP_CONTRAST),
+    }
+
+def flow_accuracy(reference, report, model_runs: int):
+    common = sorted(set(reference['landmarks']) & set(report['landmarks']))
+    result = {
+        'model_run_fraction': model_runs / report['frames'] if report['frames'] else 0.0,
+        'reference_fps': reference['fps'],
+        'frames_compared': len(common),
+        'missed_frames': len(set(reference['landmarks']) - set(report['landmarks'])),
+    }
+    if common:
+        scale = np.asarray(report['frame_size'], float)
+        errors = np.concatenate([np.linalg.norm((report['landmarks'][i] - reference['landmarks'][i])[:, :2] * scale,
+                                                axis=1) for i in common])
+        result.update(mean_error_px=float(errors.mean()), p95_error_px=float(np.percentile(errors, 95)),
+                      max_error_px=float(errors.max()))
+    return result
+
+def replay_pipeline(tracker: ReplayTracking, source: str, max_frames: int = 0):
+    result = run_pipeline(tracker, source, open_source, tracker.roi, max_frames)
+    if result is None:
+        return None
+    summary = tracker.stats.summary()
+    elapsed = result['elapsed']
+    return {
+        'frames': result['processed'],
+        'fps': result['processed'] / elapsed if elapsed > 0 else 0.0,
+        'captured_fps': result['captured'] / elapsed if elapsed > 0 else 0.0,
+        'dropped_frames': result['dropped'],
+        'detection_rate': summary['detection_rate'],
+        'injected_events': tracker.mouse_mover.backend.events_sent,
+        'stages': summary['stages'],
+        'timestamps': [],
+        'raw_track': [],
+        'landmarks': {},
+    }
+
+def score_filters(report, window_size: int = 8, smoothing: float = 0.9):
+    timestamps = np.asarray(report['timestamps'])
+    raw = np.asarray(report['raw_track'], dtype=float)
+    if len(raw) < 3:
+        return {}
+    return {name: score_filter(make_filter(name, window_size=window_size, smoothing=smoothing), timestamps, raw)
+            for name in FILTERS}
+
+def print_report(report):
+    if report.get('startup_ms'):
+        print("[+] Запуск: " + ", ".join(f"{name} {ms:.0f} мс" for name, ms in report['startup_ms'].items()))
+    print(f"[+] Кадров: {report['frames']}, FPS: {report['fps']:.1f}, "
+          f"рука найдена: {report['detection_rate'] * 100:.1f}%")
+    print(f"{'этап':14s} {'n':>6s} {'mean':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s}  (мс)")
+    for stage, values in report['stages'].items():
+        print(f"{stage:14s} {values['count']:6d} {values['mean_ms']:8.2f} {values['p50_ms']:8.2f} "
+              f"{values['p95_ms']:8.2f} {values['p99_ms']:8.2f}")
+    if 'captured_fps' in report:
+        print(f"\n[+] Конвейер: захвачено {report['captured_fps']:.1f} FPS, "
+              f"отброшено кадров: {report['dropped_frames']}")
+    idle = report.get('idle')
+    if idle is not None:
+        print(f"\n[+] Ожидание: {idle['idle_fraction'] * 100:.1f}% видео, CPU {idle['idle_cpu_percent']:.1f}% "
+              f"(активно {idle['active_cpu_percent']:.1f}%), пробуждений: {idle['wakeups']}")
+        if idle['wake_latency_ms'] is not None:
+            print(f"[+] Пробуждение до руки: {idle['wake_latency_ms']:.1f} мс в среднем, "
+                  f"{idle['wake_latency_max_ms']:.1f} мс максимум (время видео)")
+    exposure = report.get('exposure')
+    if exposure:
+        brightness, contrast = (f"{exposure[name]:.0f}" if exposure[name] is not None else "нет"
+                                for name in ('brightness', 'contrast'))
+        print(f"\n[+] Экспозиция: {exposure['adjustments']} подстроек, яркость {brightness}, контраст {contrast}")
+        if exposure['luminance_mean'] is not None:
+            print(f"[+] Освещённость кадра: {exposure['luminance_mean']:.0f} в среднем, "
+                  f"минимум {exposure['luminance_min']:.0f}")
+    memory = report.get('memory')
+    if memory:
+        print(f"\n[+] Память: выделено {memory['allocated_kb_per_frame']:.0f} КБ на кадр "
+              f"(максимум {memory['allocated_kb_max']:.0f} КБ)")
+        if memory['peak_rss_mb'] is not None:
+            print(f"[+] Пиковый RSS: {memory['peak_rss_mb']:.0f} МБ, рост за прогон {memory['peak_rss_growth_mb']:.1f} МБ")
+    flow = report.get('flow')
+    if flow:
+        print(f"\n[+] Оптический поток: модель на {flow['model_run_fraction'] * 100:.1f}% кадров, "
+              f"без потока {flow['reference_fps']:.1f} FPS, потеряно кадров с рукой: {flow['missed_frames']}")
+        if flow['frames_compared']:
+            print(f"[+] Отклонение точек от полного распознавания: {flow['mean_error_px']:.1f} px в среднем, "
+                  f"p95 {flow['p95_error_px']:.1f} px, максимум {flow['max_error_px']:.1f} px")
+    if report.get('filters'):
+        print(f"\n{'фильтр':14s} {'задержка, мс':>13s} {'дрожание, px':>13s} {'ошибка, px':>11s}")
+        for name, score in report['filters'].items():
+            print(f"{name:14s} {score['lag_ms']:13.1f} {score['jitter_px']:13.2f} {score['error_px']:11.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Прогон записанного видео через HandTracking без камеры и экрана")
+    parser.add_argument('source', help="видеофайл, шаблон вида frames/%%04d.png или папка с кадрами")
+    parser.add_argument('--frames', type=int, default=0, help="ограничить число кадров")
+    parser.add_argument('--warmup', type=int, default=5, help="кадры прогрева, не входящие в статистику")
+    parser.add_argument('--draw', action='store_true', help="включить отрисовку скелета руки")
+    parser.add_argument('--score-filters', action='store_true',
+                        help="сравнить все фильтры курсора по задержке и дрожанию")
+    parser.add_argument('--json', help="сохранить результат в JSON")
+    parser.add_argument('--memory', action='store_true',
+                        help="измерять выделение памяти на кадр (медленнее)")
+    parser.add_argument('--no-reuse', action='store_true',
+                        help="выделять новые буферы на каждый кадр, для сравнения")
+    parser.add_argument('--exposure', action='store_true', help="включить подстройку яркости камеры")
+    parser.add_argument('--lighting', type=float, metavar='DIM',
+                        help="затемнять среднюю треть видео в DIM раз, яркость и контраст управляемы")
+    add_filter_arguments(parser)
+    add_idle_arguments(parser)
+    add_roi_arguments(parser)
+    add_pipeline_arguments(parser)
+    add_flow_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    if args.flow and args.pipeline:
+        parser.error("--flow нельзя использовать вместе с --pipeline")
+
+    flow = flow_from_args(args)
+    reference = None
+    if flow is not None:
+        reference_tracker = ReplayTracking(args.source, calibrate=False, headless=True)
+        try:
+            reference = replay(reference_tracker, args.frames, args.warmup, keep_landmarks=True)
+        finally:
+            reference_tracker.cleanup()
+
+    tracker = ReplayTracking(args.source, calibrate=args.exposure, cursor_filter=filter_from_args(args),
+                             headless=True, idle=idle_from_args(args), roi=roi_from_args(args),
+                             pipeline=args.pipeline, flow=flow, reuse_buffers=not args.no_reuse,
+                             trace=trace_from_args(args, labels=False), settings=settings_from_args(args))
+    if args.lighting and tracker.cap is not None:
+        tracker.cap = tracker.capture.cap = SimulatedLighting(tracker.cap, args.lighting)
+    if args.pipeline:
+        report = replay_pipeline(tracker, args.source, args.frames)
+        tracker.cleanup()
+        if report is None:
+            return 1
+    elif not tracker.cap.isOpened():
+        print(f"Не удалось открыть {args.source}")
+        return 1
+    else:
+        try:
+            report = replay(tracker, args.frames, args.warmup, args.draw, keep_landmarks=flow is not None,
+                            track_memory=args.memory)
+        finally:
+            tracker.cleanup()
+
+    if args.score_filters:
+        report['filters'] = score_filters(report, tracker.window_size, tracker.SMOOTHING)
+    if reference is not None:
+        model_runs = report['stages'].get('inference', {}).get('count', 0)
+        report['flow'] = flow_accuracy(reference, report, model_runs)
+    report['startup_ms'] = {name: duration * 1000 for name, _, duration, _ in tracker.startup.phases if duration}
+    del report['timestamps'], report['raw_track'], report['landmarks']
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
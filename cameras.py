@@ -0,0 +1,226 @@
+import glob
+import json
+import os
+import re
+import struct
+import sys
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+
+VIDIOC_QUERYCAP = 0x80685600
+V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+V4L2_CAP_DEVICE_CAPS = 0x80000000
+PROBE_INDEXES = 10
+VIDEO_INTERFACE_CLASSES = (
+    r'SYSTEM\CurrentControlSet\Control\DeviceClasses\{e5323777-f976-4f5b-9b55-b94699c46e44}',
+    r'SYSTEM\CurrentControlSet\Control\DeviceClasses\{65e8773d-8f56-11d0-a3b9-00a0c9223196}',
+)
+
+def data_dir() -> str:
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    else:
+        base = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+    path = os.path.join(base, 'wrht')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def load_json(name: str) -> dict:
+    try:
+        with open(os.path.join(data_dir(), name)) as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_json(name: str, data: dict):
+    try:
+        with open(os.path.join(data_dir(), name), 'w') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"[-] Не удалось сохранить {name}: {e}")
+
+def video_devices():
+    devices = []
+    for path in glob.glob('/dev/video*'):
+        match = re.fullmatch(r'/dev/video(\d+)', path)
+        if match:
+            devices.append((int(match.group(1)), path))
+    return sorted(devices)
+
+def device_fingerprint() -> str:
+    if sys.platform.startswith('linux'):
+        parts = []
+        for index, path in video_devices():
+            try:
+                st = os.stat(path)
+                parts.append(f"{index}:{st.st_rdev}:{st.st_ctime_ns}")
+            except OSError:
+                parts.append(f"{index}:?")
+        return ';'.join(parts)
+    if sys.platform == 'win32':
+        return ';'.join(windows_video_interfaces()) or sys.platform
+    return sys.platform
+
+def windows_video_interfaces():
+    try:
+        import winreg
+    except ImportError:
+        return []
+    interfaces = set()
+    for path in VIDEO_INTERFACE_CLASSES:
+        try:
+            key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path)
+        except OSError:
+            continue
+        with key:
+            index = 0
+            while True:
+                try:
+                    name = winreg.EnumKey(key, index)
+                except OSError:
+                    break
+                index += 1
+                try:
+                    with winreg.OpenKey(key, name + r'\#\Control') as control:
+                        if winreg.QueryValueEx(control, 'Linked')[0]:
+                            interfaces.add(name.lower())
+                except OSError:
+                    pass
+    return sorted(interfaces)
+
+def query_v4l2(index: int, path: str):
+    import fcntl
+    name = f"Камера {index}"
+    try:
+        with open(f'/sys/class/video4linux/video{index}/name') as f:
+            name = f"{f.read().strip()} ({index})"
+    except OSError:
+        pass
+
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        return name
+    try:
+        buffer = bytearray(104)
+        fcntl.ioctl(fd, VIDIOC_QUERYCAP, buffer)
+    except OSError:
+        return name
+    finally:
+        os.close(fd)
+
+    card = bytes(buffer[16:48]).split(b'\0', 1)[0].decode(errors='replace')
+    capabilities, device_caps = struct.unpack_from('<II', buffer, 84)
+    if capabilities & V4L2_CAP_DEVICE_CAPS:
+        capabilities = device_caps
+    if not capabilities & V4L2_CAP_VIDEO_CAPTURE:
+        return None
+    return f"{card} ({index})" if card else name
+
+def probe_opencv(index: int):
+    import cv2
+    api = cv2.CAP_DSHOW if sys.platform == 'win32' else cv2.CAP_ANY
+    cap = cv2.VideoCapture(index, api)
+    try:
+        if not cap.isOpened():
+            return None
+        try:
+            return f"Камера {index} ({cap.getBackendName()})"
+        except Exception:
+            return f"Камера {index}"
+    finally:
+        cap.release()
+
+def scan_cameras() -> dict:
+    if sys.platform.startswith('linux') and os.path.isdir('/sys/class/video4linux'):
+        found = {index: query_v4l2(index, path) for index, path in video_devices()}
+    else:
+        with ThreadPoolExecutor(max_workers=PROBE_INDEXES) as pool:
+            found = dict(zip(range(PROBE_INDEXES), pool.map(probe_opencv, range(PROBE_INDEXES))))
+    return {index: name for index, name in found.items() if name}
+
+def list_cameras(rescan: bool = False) -> dict:
+    fingerprint = device_fingerprint()
+    cache = load_json('cameras.json')
+    if not rescan and cache.get('fingerprint') == fingerprint and cache.get('cameras'):
+        return {int(index): name for index, name in cache['cameras'].items()}
+
+    cameras = scan_cameras()
+    save_json('cameras.json', {'fingerprint': fingerprint, 'cameras': cameras})
+    return cameras
+
+def saved_camera(cameras: dict):
+    index = load_json('settings.json').get('camera')
+    return index if index in cameras else None
+
+def camera_available(index: int) -> bool:
+    if sys.platform.startswith('linux') and os.path.isdir('/sys/class/video4linux'):
+        path = f'/dev/video{index}'
+        return os.path.exists(path) and query_v4l2(index, path) is not None
+    return probe_opencv(index) is not None
+
+def save_camera(index: int):
+    settings = load_json('settings.json')
+    settings['camera'] = index
+    save_json('settings.json', settings)
+
+class CameraSelector:
+    def __init__(self):
+        self.root = tk.Tk()
+        self.root.title("Выбор камеры")
+        self.selected_camera = None
+        self.root.configure(bg='#2b2b2b')
+        style = ttk.Style()
+        style.theme_use('clam')
+        self.cameras = list_cameras()
+
+        label = tk.Label(self.root, text="Выберите камеру:", bg='#2b2b2b', fg='white', font=('Arial', 12))
+        label.pack(pady=10)
+
+        self.combo = ttk.Combobox(self.root, values=list(self.cameras.values()), width=30, font=('Arial', 10))
+        self.combo.set("Выберите камеру")
+        self.combo.pack(padx=20, pady=10)
+
+        self.remember = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.root, text="Запомнить выбор", variable=self.remember, bg='#2b2b2b', fg='white',
+                       selectcolor='#2b2b2b', activebackground='#2b2b2b').pack()
+
+        ttk.Button(self.root, text="Обновить список", command=self.on_rescan).pack(pady=(10, 0))
+        ttk.Button(self.root, text="Подтвердить", command=self.on_select).pack(pady=10)
+        self.root.eval('tk::PlaceWindow . center')
+
+    def on_rescan(self):
+        self.cameras = list_cameras(rescan=True)
+        self.combo.configure(values=list(self.cameras.values()))
+
+    def on_select(self):
+        for key, value in self.cameras.items():
+            if value == self.combo.get():
+                self.selected_camera = key
+                break
+        if self.selected_camera is not None and self.remember.get():
+            save_camera(self.selected_camera)
+        self.root.quit()
+        self.root.destroy()
+
+    def get_camera(self):
+        self.root.mainloop()
+        return self.selected_camera
+
+def choose_camera(args):
+    if args.camera is not None:
+        return args.camera
+    if not args.choose_camera:
+        index = saved_camera(list_cameras())
+        if index is not None and not camera_available(index):
+            print(f"[-] Камера {index} не открывается, список камер обновлён")
+            index = saved_camera(list_cameras(rescan=True))
+        if index is not None:
+            print(f"[+] Используется сохранённая камера {index} (--choose-camera для выбора)")
+            return index
+    return CameraSelector().get_camera()
+
+def add_camera_arguments(parser):
+    parser.add_argument('--camera', type=int, help="номер камеры, без окна выбора")
+    parser.add_argument('--choose-camera', action='store_true', help="игнорировать сохранённую камеру")
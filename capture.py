@@ -0,0 +1,239 @@
+import threading
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+import cv2
+import numpy as np
+from v4l2 import CameraMode, choose_mode, device_path, fourcc_name, list_modes
+
+class Frame(NamedTuple):
+    image: np.ndarray
+    timestamp: float
+    index: int
+
+MAX_GRAB_STRIDE = 2
+REDUCED_DECODE = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+def read_mode(cap) -> CameraMode:
+    return CameraMode(fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                      int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), round(cap.get(cv2.CAP_PROP_FPS), 2))
+
+def open_camera(camera_index, api=cv2.CAP_ANY, fourcc=None, width=1280, height=720, fps=60,
+                negotiate=True, decode_scale=1, min_width=640):
+    path = device_path(camera_index) if negotiate and api in (cv2.CAP_ANY, cv2.CAP_V4L2) else None
+    mode = choose_mode(list_modes(path, width, height), width, height, fps, min_width) if path else None
+    if mode is None:
+        cap = cv2.VideoCapture(camera_index, api)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv2.CAP_PROP_FPS, fps)
+        if fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        return cap
+
+    cap = cv2.VideoCapture(camera_index, cv2.CAP_V4L2)
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*mode.fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, mode.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, mode.height)
+    cap.set(cv2.CAP_PROP_FPS, mode.fps)
+    negotiated = read_mode(cap)
+    if negotiated == mode:
+        print(f"[+] Режим камеры: {negotiated}")
+    else:
+        print(f"[-] Камера выбрала {negotiated} вместо {mode}")
+
+    while decode_scale > 1 and (decode_scale not in REDUCED_DECODE or negotiated.width // decode_scale < min_width):
+        decode_scale //= 2
+    if negotiated.compressed and decode_scale > 1 and cap.set(cv2.CAP_PROP_CONVERT_RGB, 0):
+        print(f"[+] MJPEG декодируется в 1/{decode_scale} размера: "
+              f"{negotiated.width // decode_scale}x{negotiated.height // decode_scale}")
+        return ReducedDecodeCapture(cap, decode_scale)
+    return cap
+
+class ReducedDecodeCapture:
+    def __init__(self, cap, scale: int):
+        self.cap = cap
+        self.scale = scale
+        self.flags = REDUCED_DECODE[scale]
+        self.packet = None
+
+    def read(self, image=None):
+        success, packet = self.cap.read(self.packet)
+        if not success or packet.ndim != 2 or packet.shape[0] != 1:
+            return success, packet
+        self.packet = packet
+        decoded = cv2.imdecode(packet, self.flags)
+        return decoded is not None, decoded
+
+    def grab(self):
+        return self.cap.grab()
+
+    def get(self, prop):
+        value = self.cap.get(prop)
+        if prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+            return value // self.scale
+        return value
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+def flip_to_rgb(image, out):
+    height, width, channels = image.shape
+    cv2.flip(image.reshape(height, width * channels), 1, dst=out.reshape(height, width * channels))
+    return out
+
+class FramePool:
+    def __init__(self, size: int = 4):
+        self.size = size
+        self.free = []
+        self.lock = threading.Lock()
+        self.allocated = 0
+
+    def acquire(self, shape):
+        with self.lock:
+            while self.free:
+                buffer = self.free.pop()
+                if buffer.shape == shape:
+                    return buffer
+        self.allocated += 1
+        return np.empty(shape, np.uint8)
+
+    def release(self, buffer):
+        with self.lock:
+            if len(self.free) < self.size:
+                self.free.append(buffer)
+
+class CaptureThread:
+    def __init__(self, cap, slots: int = 1, pool: FramePool = None, controller=None, measure_frames: int = 60):
+        self.cap = cap
+        self.controller = controller
+        self.slots = deque()
+        self.max_slots = max(1, slots)
+        self.pool = pool
+        self.shape = None
+        self.condition = threading.Condition()
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self.skipped_frames = 0
+        self.stride = 1
+        self.pending_stride = None
+        self.full_fps = None
+        self.measure_frames = measure_frames
+        self.measure_start = None
+        self.measured_fps = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="capture", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def _loop(self):
+        sequence = 0
+        while self.running:
+            if self.pending_stride is not None:
+                self.apply_stride(self.pending_stride)
+            sequence += 1
+            if self.stride > 1 and sequence % self.stride:
+                if self.cap.grab():
+                    self.skipped_frames += 1
+                continue
+
+            buffer = self.pool.acquire(self.shape) if self.pool is not None and self.shape else None
+            success, image = self.cap.read(buffer)
+            timestamp = time.monotonic()
+            if buffer is not None and image is not buffer:
+                self.release(buffer)
+            if not success:
+                time.sleep(0.005)
+                continue
+            self.shape = image.shape
+            if self.measured_fps is None:
+                self.measure(timestamp)
+            if self.controller is not None:
+                self.controller.update(self.cap, image)
+
+            with self.condition:
+                if len(self.slots) == self.max_slots:
+                    self.dropped_frames += 1
+                    self.release(self.slots.popleft().image)
+                self.slots.append(Frame(image, timestamp, self.captured_frames))
+                self.captured_frames += 1
+                self.condition.notify()
+
+    def set_stride(self, stride: int):
+        if self.running:
+            self.pending_stride = stride
+        else:
+            self.apply_stride(stride)
+
+    def apply_stride(self, stride: int):
+        self.pending_stride = None
+        if stride <= 1:
+            if self.full_fps is not None:
+                self.cap.set(cv2.CAP_PROP_FPS, self.full_fps)
+                self.full_fps = None
+            self.stride = 1
+            return
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        if self.full_fps is None and fps > 0 and self.cap.set(cv2.CAP_PROP_FPS, fps / stride) \
+                and self.cap.get(cv2.CAP_PROP_FPS) < fps * 0.75:
+            self.full_fps = fps
+            self.stride = 1
+        elif self.full_fps is None:
+            self.stride = min(stride, MAX_GRAB_STRIDE)
+
+    def measure(self, timestamp: float):
+        frames = self.captured_frames + self.skipped_frames
+        if self.measure_start is None:
+            self.measure_start = (frames, timestamp)
+        elif frames - self.measure_start[0] >= self.measure_frames:
+            self.measured_fps = (frames - self.measure_start[0]) / (timestamp - self.measure_start[1])
+            print(f"[+] Камера отдаёт {self.measured_fps:.1f} FPS")
+
+    def read(self, timeout: float = 1.0) -> Optional[Frame]:
+        with self.condition:
+            if not self.slots:
+                self.condition.wait(timeout)
+            if not self.slots:
+                return None
+            frame = self.slots.pop()
+            self.dropped_frames += len(self.slots)
+            while self.slots:
+                self.release(self.slots.popleft().image)
+            return frame
+
+    def release(self, image):
+        if self.pool is not None:
+            self.pool.release(image)
+
+def add_capture_arguments(parser):
+    parser.add_argument('--fps', type=int, default=60, help="желаемая частота кадров камеры")
+    parser.add_argument('--decode-scale', type=int, default=2, choices=[1, 2, 4, 8],
+                        help="декодировать MJPEG сразу в уменьшенном в N раз виде")
+    parser.add_argument('--no-negotiate', action='store_true',
+                        help="не подбирать формат камеры через V4L2")
+
+def capture_options(args):
+    return {
+        'camera_fps': args.fps,
+        'decode_scale': args.decode_scale,
+        'negotiate': not args.no_negotiate,
+    }
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import deque
+from gestures import GESTURE_PRESS, GESTURE_RELEASE, GESTURE_RIGHT_CLICK, GESTURE_SCROLL
+
+BUTTON_EVENTS = GESTURE_PRESS | GESTURE_RELEASE | GESTURE_RIGHT_CLICK | GESTURE_SCROLL
+
+class ControlScheduler:
+    def __init__(self, mouse_mover, stats, threaded: bool = True):
+        self.mouse_mover = mouse_mover
+        self.stats = stats
+        self.threaded = threaded
+        self.condition = threading.Condition()
+        self.buttons = deque()
+        self.position = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if not self.threaded or self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="control", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join(timeout=1.0)
+        self.thread = None
+        while self.buttons:
+            self._buttons(*self.buttons.popleft())
+
+    def submit(self, events: int, scroll_steps: int, origin: float):
+        if not events & BUTTON_EVENTS:
+            return
+        if not self.running:
+            self._buttons(events, scroll_steps, origin)
+            return
+        with self.condition:
+            self.buttons.append((events, scroll_steps, origin))
+            self.condition.notify()
+
+    def move(self, x: int, y: int, origin: float):
+        if not self.running:
+            self._move(x, y, origin)
+            return
+        with self.condition:
+            if self.position is not None:
+                self.stats.count('moves_dropped')
+            self.position = (x, y, origin)
+            self.condition.notify()
+
+    def _loop(self):
+        while True:
+            with self.condition:
+                while self.running and not self.buttons and self.position is None:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                buttons = list(self.buttons)
+                self.buttons.clear()
+                position, self.position = self.position, None
+            for item in buttons:
+                self._buttons(*item)
+            if position is not None:
+                self._move(*position)
+
+    def _buttons(self, events: int, scroll_steps: int, origin: float):
+        with self.stats.time('inject_click'):
+            if events & GESTURE_PRESS:
+                self.mouse_mover.press()
+            if events & GESTURE_RELEASE:
+                self.mouse_mover.release()
+            if events & GESTURE_RIGHT_CLICK:
+                self.mouse_mover.right_click()
+            if events & GESTURE_SCROLL:
+                self.mouse_mover.scroll(scroll_steps)
+        self.stats.add('click_latency', time.monotonic() - origin)
+
+    def _move(self, x: int, y: int, origin: float):
+        with self.stats.time('inject'):
+            self.mouse_mover.update(x, y)
+        self.stats.add('move_latency', time.monotonic() - origin)
+
+def add_control_arguments(parser):
+    parser.add_argument('--frame-budget', type=float, default=60.0,
+                        help="срок обработки кадра от захвата, мс; при опоздании отрисовка пропускается")
+    parser.add_argument('--sync-input', action='store_true',
+                        help="отправлять события мыши из потока распознавания, без отдельного потока")
+
+def control_options(args):
+    return {
+        'frame_budget': args.frame_budget / 1000,
+        'threaded_input': not args.sync_input,
+    }
@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+from v4l2 import V4L2_CID_BRIGHTNESS, V4L2_CID_CONTRAST, control_range, device_path
+
+V4L2_CONTROLS = {cv2.CAP_PROP_BRIGHTNESS: V4L2_CID_BRIGHTNESS, cv2.CAP_PROP_CONTRAST: V4L2_CID_CONTRAST}
+
+def control_ranges(camera_index) -> dict:
+    path = device_path(camera_index)
+    if path is None:
+        return {}
+    ranges = {}
+    for prop, control in V4L2_CONTROLS.items():
+        limits = control_range(path, control)
+        if limits is not None:
+            ranges[prop] = limits
+    return ranges
+
+class ExposureController:
+    def __init__(self, every: int = 10, size=(64, 36), low: float = 80, high: float = 170,
+                 gain: float = 0.3, step: float = 16, contrast_step: float = 4, min_spread: float = 70,
+                 max_clipped: float = 0.08, ranges=None, span: float = 128, smoothing: float = 0.5):
+        self.every = max(1, every)
+        self.size = size
+        self.low = low
+        self.high = high
+        self.gain = gain
+        self.step = step
+        self.contrast_step = contrast_step
+        self.min_spread = min_spread
+        self.max_clipped = max_clipped
+        self.ranges = dict(ranges or {})
+        self.span = span
+        self.smoothing = smoothing
+        self.small = np.empty((size[1], size[0], 3), np.uint8)
+        self.gray = np.empty((size[1], size[0]), np.uint8)
+        self.frames = 0
+        self.luminance = None
+        self.spread = 0.0
+        self.clipped = 0.0
+        self.direction = 0
+        self.properties = None
+        self.adjustments = 0
+
+    def sample(self, image):
+        cv2.resize(image, self.size, dst=self.small, interpolation=cv2.INTER_NEAREST)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        histogram = cv2.calcHist([self.gray], [0], None, [32], [0, 256]).ravel()
+        total = histogram.sum()
+        cumulative = np.cumsum(histogram) / total
+        mean = float(np.dot(histogram, np.arange(4, 256, 8))) / total
+        self.spread = float(np.searchsorted(cumulative, 0.95) - np.searchsorted(cumulative, 0.05)) * 8
+        self.clipped = float(histogram[0] + histogram[-1]) / total
+        if self.luminance is None:
+            self.luminance = mean
+        else:
+            self.luminance += self.smoothing * (mean - self.luminance)
+
+    def update(self, cap, image):
+        self.frames += 1
+        if self.frames % self.every:
+            return
+        self.sample(image)
+        if self.properties is None:
+            self.properties = {}
+            for prop in (cv2.CAP_PROP_BRIGHTNESS, cv2.CAP_PROP_CONTRAST):
+                value = cap.get(prop)
+                if cap.set(prop, value):
+                    self.properties[prop] = value
+                    self.ranges.setdefault(prop, (value - self.span, value + self.span))
+
+        middle = (self.low + self.high) / 2
+        if self.luminance < self.low:
+            self.direction = 1
+        elif self.luminance > self.high:
+            self.direction = -1
+        elif self.direction * (self.luminance - middle) > 0:
+            self.direction = 0
+
+        if self.direction:
+            delta = min(max((middle - self.luminance) * self.gain, -self.step), self.step)
+            self.adjust(cap, cv2.CAP_PROP_BRIGHTNESS, delta)
+        elif self.clipped > self.max_clipped:
+            self.adjust(cap, cv2.CAP_PROP_CONTRAST, -self.contrast_step)
+        elif self.spread < self.min_spread:
+            self.adjust(cap, cv2.CAP_PROP_CONTRAST, self.contrast_step)
+
+    def adjust(self, cap, prop, delta):
+        value = self.properties.get(prop)
+        if value is None:
+            return
+        low, high = self.ranges[prop]
+        value = min(max(value + delta, low), high)
+        if value == self.properties[prop]:
+            return
+        if not cap.set(prop, value):
+            del self.properties[prop]
+            return
+        value = cap.get(prop)
+        if value == self.properties[prop]:
+            return
+        self.properties[prop] = value
+        self.adjustments += 1
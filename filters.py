@@ -0,0 +1,191 @@
+import math
+import numpy as np
+
+DEFAULT_LEAD = 0.01
+MAX_LEAD = 0.1
+
+def prediction_lead(fixed: float = None, measured: float = None) -> float:
+    if fixed is not None:
+        return fixed
+    return DEFAULT_LEAD if measured is None else min(max(measured, 0.0), MAX_LEAD)
+
+class AverageFilter:
+    name = "average"
+
+    def __init__(self, window_size: int = 8, smoothing: float = 0.9, **kwargs):
+        self.smoothing = smoothing
+        self.window = np.zeros((window_size, 2))
+        self.sum = np.zeros(2)
+        self.state = np.zeros(2)
+        self.count = 0
+        self.index = 0
+
+    def reset(self, x: float, y: float):
+        self.window[:] = 0
+        self.sum[:] = 0
+        self.state[:] = (x, y)
+        self.count = 0
+        self.index = 0
+
+    def update(self, x: float, y: float, timestamp: float, lead: float = None):
+        if self.count == len(self.window):
+            self.sum -= self.window[self.index]
+        else:
+            self.count += 1
+        self.window[self.index] = (x, y)
+        self.sum += self.window[self.index]
+        self.index = (self.index + 1) % len(self.window)
+
+        self.state *= self.smoothing
+        self.state += (1 - self.smoothing) * self.sum / self.count
+        return self.state[0], self.state[1]
+
+class OneEuroFilter:
+    name = "one_euro"
+
+    def __init__(self, min_cutoff: float = 0.05, beta: float = 0.008, d_cutoff: float = 1.0,
+                 lead: float = None, **kwargs):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.lead = lead
+        self.position = np.zeros(2)
+        self.velocity = np.zeros(2)
+        self.raw = np.zeros(2)
+        self.previous = np.zeros(2)
+        self.output = np.zeros(2)
+        self.timestamp = None
+
+    @staticmethod
+    def alpha(cutoff: float, dt: float) -> float:
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self, x: float, y: float):
+        self.position[:] = (x, y)
+        self.velocity[:] = 0
+        self.timestamp = None
+
+    def update(self, x: float, y: float, timestamp: float, lead: float = None):
+        self.raw[:] = (x, y)
+        if self.timestamp is None or timestamp <= self.timestamp:
+            self.position[:] = self.raw
+            self.previous[:] = self.raw
+            self.timestamp = timestamp
+            return x, y
+        dt = timestamp - self.timestamp
+        self.timestamp = timestamp
+
+        a_d = self.alpha(self.d_cutoff, dt)
+        self.velocity += a_d * ((self.raw - self.previous) / dt - self.velocity)
+        self.previous[:] = self.raw
+
+        speed = math.hypot(self.velocity[0], self.velocity[1])
+        a = self.alpha(self.min_cutoff + self.beta * speed, dt)
+        self.position += a * (self.raw - self.position)
+
+        np.multiply(self.velocity, prediction_lead(self.lead, lead), out=self.output)
+        self.output += self.position
+        return self.output[0], self.output[1]
+
+class KalmanFilter:
+    name = "kalman"
+
+    def __init__(self, process_noise: float = 1e6, measurement_noise: float = 64.0,
+                 lead: float = None, **kwargs):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.lead = lead
+        self.position = np.zeros(2)
+        self.velocity = np.zeros(2)
+        self.innovation = np.zeros(2)
+        self.output = np.zeros(2)
+        self.covariance = np.zeros((2, 2))
+        self.timestamp = None
+
+    def reset(self, x: float, y: float):
+        self.position[:] = (x, y)
+        self.velocity[:] = 0
+        self.timestamp = None
+
+    def update(self, x: float, y: float, timestamp: float, lead: float = None):
+        if self.timestamp is None or timestamp <= self.timestamp:
+            self.position[:] = (x, y)
+            self.velocity[:] = 0
+            self.covariance[:] = ((self.r, 0.0), (0.0, self.q * 0.01))
+            self.timestamp = timestamp
+            return x, y
+        dt = timestamp - self.timestamp
+        self.timestamp = timestamp
+
+        # Both axes share dt and noise, so one 2x2 covariance serves x and y.
+        p = self.covariance
+        p00 = p[0, 0] + dt * (p[1, 0] + p[0, 1]) + dt * dt * p[1, 1] + self.q * dt ** 4 / 4
+        p01 = p[0, 1] + dt * p[1, 1] + self.q * dt ** 3 / 2
+        p11 = p[1, 1] + self.q * dt * dt
+        self.position += self.velocity * dt
+
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        self.innovation[:] = (x, y)
+        self.innovation -= self.position
+        self.position += k0 * self.innovation
+        self.velocity += k1 * self.innovation
+        p[0, 0] = (1 - k0) * p00
+        p[0, 1] = p[1, 0] = (1 - k0) * p01
+        p[1, 1] = p11 - k1 * p01
+
+        np.multiply(self.velocity, prediction_lead(self.lead, lead), out=self.output)
+        self.output += self.position
+        return self.output[0], self.output[1]
+
+FILTERS = {
+    AverageFilter.name: AverageFilter,
+    OneEuroFilter.name: OneEuroFilter,
+    KalmanFilter.name: KalmanFilter,
+}
+
+def make_filter(name: str, **params):
+    return FILTERS[name](**params)
+
+def reference_track(raw: np.ndarray, window: int = 7) -> np.ndarray:
+    kernel = np.ones(window) / window
+    padded = np.pad(raw, ((window // 2, window // 2), (0, 0)), mode='edge')
+    return np.stack([np.convolve(padded[:, axis], kernel, mode='valid') for axis in range(raw.shape[1])], axis=1)
+
+def score_filter(cursor_filter, timestamps: np.ndarray, raw: np.ndarray, max_shift: int = 30):
+    cursor_filter.reset(*raw[0])
+    output = np.array([cursor_filter.update(x, y, t) for (x, y), t in zip(raw, timestamps)])
+    return score_track(output, timestamps, raw, max_shift)
+
+def score_track(output: np.ndarray, timestamps: np.ndarray, raw: np.ndarray, max_shift: int = 30):
+    reference = reference_track(raw)
+
+    best_shift, best_error = 0, math.inf
+    for shift in range(0, min(max_shift, len(raw) - 2) + 1):
+        error = np.sqrt(np.mean(np.sum((output[shift:] - reference[:len(reference) - shift]) ** 2, axis=1)))
+        if error < best_error:
+            best_shift, best_error = shift, error
+
+    aligned = reference[:len(reference) - best_shift]
+    noise = np.diff(output[best_shift:], axis=0) - np.diff(aligned, axis=0)
+    frame_time = float(np.median(np.diff(timestamps))) if len(timestamps) > 1 else 0.0
+    return {
+        'lag_ms': best_shift * frame_time * 1000,
+        'jitter_px': float(np.sqrt(np.mean(np.sum(noise ** 2, axis=1)))) if len(noise) else 0.0,
+        'error_px': float(best_error),
+    }
+
+def add_filter_arguments(parser):
+    parser.add_argument('--filter', default=AverageFilter.name, choices=list(FILTERS),
+                        help="фильтр сглаживания курсора")
+    parser.add_argument('--filter-lead', type=float, default=None,
+                        help="упреждение предсказания, с (для one_euro и kalman)")
+
+def filter_from_args(args):
+    if args.filter == AverageFilter.name:
+        return None
+    params = {}
+    if args.filter_lead is not None:
+        params['lead'] = args.filter_lead
+    return make_filter(args.filter, **params)
@@ -0,0 +1,114 @@
+import math
+import cv2
+import numpy as np
+from landmarks import NUM_LANDMARKS, LandmarkList
+
+LK_CRITERIA = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+
+class LandmarkFlow:
+    def __init__(self, max_every: int = 4, width: int = 640, frame_interval: float = 1 / 30,
+                 budget: float = 0.5, max_motion: float = 30.0, max_error: float = 1.5,
+                 min_valid: float = 0.75, min_score: float = 0.8):
+        self.max_every = max(1, max_every)
+        self.width = width
+        self.frame_interval = frame_interval
+        self.budget = budget
+        self.max_motion = max_motion
+        self.max_error = max_error
+        self.min_valid = int(math.ceil(NUM_LANDMARKS * min_valid))
+        self.min_score = min_score
+        self.every = 1
+        self.since = 0
+        self.inference_time = None
+        self.speed = 0.0
+        self.size = None
+        self.small = None
+        self.previous = None
+        self.current = None
+        self.points = None
+        self.depth = None
+
+    def reset(self):
+        self.points = None
+        self.since = 0
+
+    def due(self) -> bool:
+        return self.points is None or self.since + 1 >= self.every
+
+    def _downsample(self, image):
+        height, width = image.shape[:2]
+        if self.size is None or self.size[2:] != (width, height):
+            small_width = min(self.width, width)
+            self.size = (small_width, round(height * small_width / width), width, height)
+            self.small = np.empty((self.size[1], small_width, 3), np.uint8)
+            self.previous = np.empty(self.small.shape[:2], np.uint8)
+            self.current = np.empty_like(self.previous)
+        cv2.resize(image, self.size[:2], dst=self.small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.current)
+
+    def keyframe(self, image, hand_landmarks, score: float, inference_time: float):
+        if self.inference_time is None:
+            self.inference_time = inference_time
+        else:
+            self.inference_time += 0.1 * (inference_time - self.inference_time)
+        if hand_landmarks is None or score < self.min_score:
+            self.reset()
+            return
+
+        self._downsample(image)
+        self.previous, self.current = self.current, self.previous
+        width, height = self.size[:2]
+        landmarks = np.array([(landmark.x, landmark.y, landmark.z) for landmark in hand_landmarks.landmark],
+                             np.float32)
+        points = np.empty((NUM_LANDMARKS, 1, 2), np.float32)
+        points[:, 0, 0] = (1.0 - landmarks[:, 0]) * width
+        points[:, 0, 1] = landmarks[:, 1] * height
+        if self.points is not None:
+            shift = np.median(np.linalg.norm((points - self.points)[:, 0], axis=1))
+            self.speed += 0.3 * (float(shift) / (self.since + 1) - self.speed)
+        self.points = points
+        self.depth = landmarks[:, 2]
+        self.since = 0
+        self._adapt()
+
+    def propagate(self, image):
+        self._downsample(image)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.previous, self.current, self.points, None,
+                                                    winSize=(15, 15), maxLevel=2, criteria=LK_CRITERIA)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(self.current, self.previous, moved, None,
+                                                        winSize=(15, 15), maxLevel=2, criteria=LK_CRITERIA)
+        error = np.linalg.norm((back - self.points)[:, 0], axis=1)
+        valid = (status[:, 0] == 1) & (back_status[:, 0] == 1) & (error < self.max_error)
+        if np.count_nonzero(valid) < self.min_valid:
+            self.reset()
+            return None
+
+        shift = np.median((moved - self.points)[valid, 0], axis=0)
+        moved[~valid, 0] = self.points[~valid, 0] + shift
+        self.speed += 0.3 * (float(np.hypot(*shift)) - self.speed)
+        self.points = moved
+        self.previous, self.current = self.current, self.previous
+        self.since += 1
+        self._adapt()
+
+        width, height = self.size[:2]
+        landmarks = np.empty((NUM_LANDMARKS, 3), np.float32)
+        landmarks[:, 0] = 1.0 - moved[:, 0, 0] / width
+        landmarks[:, 1] = moved[:, 0, 1] / height
+        landmarks[:, 2] = self.depth
+        return LandmarkList(landmarks)
+
+    def _adapt(self):
+        every = math.ceil(self.inference_time / (self.budget * self.frame_interval)) if self.inference_time else 1
+        if self.speed > 0:
+            every = min(every, int(self.max_motion / self.speed))
+        self.every = min(max(every, 1), self.max_every)
+
+def add_flow_arguments(parser):
+    parser.add_argument('--flow', action='store_true',
+                        help="между запусками модели переносить точки руки оптическим потоком")
+    parser.add_argument('--flow-max-every', type=int, default=4,
+                        help="запускать модель не реже чем на каждом N-м кадре")
+
+def flow_from_args(args):
+    return LandmarkFlow(args.flow_max_every) if args.flow else None
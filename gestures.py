@@ -0,0 +1,227 @@
+import argparse
+import math
+import time
+import tracemalloc
+import numpy as np
+from landmarks import NUM_LANDMARKS, HandLandmark
+
+GESTURE_PRESS = 1
+GESTURE_RELEASE = 2
+GESTURE_RIGHT_CLICK = 4
+GESTURE_SCROLL = 8
+GESTURE_WAVE = 16
+
+THUMB, INDEX, MIDDLE, RING, PINKY = range(5)
+FEATURE_INDEXES = np.array([
+    HandLandmark.THUMB_TIP, HandLandmark.INDEX_FINGER_TIP, HandLandmark.MIDDLE_FINGER_TIP,
+    HandLandmark.RING_FINGER_TIP, HandLandmark.PINKY_TIP,
+    HandLandmark.THUMB_IP, HandLandmark.INDEX_FINGER_PIP, HandLandmark.MIDDLE_FINGER_PIP,
+    HandLandmark.RING_FINGER_PIP, HandLandmark.PINKY_PIP,
+    HandLandmark.INDEX_FINGER_MCP, HandLandmark.WRIST, HandLandmark.WRIST,
+    HandLandmark.WRIST, HandLandmark.WRIST,
+    HandLandmark.WRIST, HandLandmark.INDEX_FINGER_MCP, HandLandmark.MIDDLE_FINGER_MCP, HandLandmark.PINKY_MCP,
+])
+WRIST_ROW, INDEX_MCP_ROW, MIDDLE_MCP_ROW, PINKY_MCP_ROW = 15, 16, 17, 18
+
+class GestureEngine:
+    def __init__(self, pinch_ratio: float = 0.15, release_ratio: float = 1.5, cooldown: float = 0.3,
+                 extension: float = 1.15, pose_frames: int = 3, scroll_step: float = 0.02,
+                 palm_facing: float = 0.3, wave_amplitude: float = 0.04, wave_swings: int = 4,
+                 wave_window: float = 1.5, wave_cooldown: float = 2.0):
+        self.pinch_ratio = pinch_ratio
+        self.release_ratio = release_ratio
+        self.cooldown = cooldown
+        self.extension_squared = extension * extension
+        self.pose_frames = pose_frames
+        self.scroll_step = scroll_step
+        self.min_palm_facing = palm_facing
+        self.wave_amplitude = wave_amplitude
+        self.wave_window = wave_window
+        self.wave_cooldown = wave_cooldown
+
+        self.gathered = np.empty((len(FEATURE_INDEXES), 3), np.float32)
+        tips = self.gathered[0:5, :2]
+        self.tip_rows = tips[:, None]
+        self.tip_columns = tips[None]
+        self.fingers = self.gathered[0:10].reshape(2, 5, 3)
+        self.anchors = self.gathered[10:15]
+        self.pair_delta = np.empty((5, 5, 2), np.float32)
+        self.distances = np.empty((5, 5), np.float32)
+        self.radial = np.empty((2, 5, 3), np.float32)
+        self.radial_xy = self.radial[..., :2]
+        self.reach = np.empty((2, 5), np.float32)
+        self.extended = np.empty(5, bool)
+        self.swings = np.zeros(max(2, wave_swings))
+        self.hand_size = 0.0
+        self.palm_facing = 0.0
+        self.last_press = -math.inf
+        self.last_wave = -math.inf
+        self.reset()
+
+    def reset(self):
+        self.pinched = False
+        self.right_pinched = False
+        self.scrolling = False
+        self.pose_count = 0
+        self.scroll_origin = 0.0
+        self.scroll_steps = 0
+        self.reset_wave()
+
+    def reset_wave(self):
+        self.wave_extreme = 0.0
+        self.wave_direction = 0
+        self.wave_tracking = False
+        self.swing_count = 0
+
+    def features(self, points):
+        np.take(points, FEATURE_INDEXES, axis=0, out=self.gathered)
+        np.subtract(self.tip_rows, self.tip_columns, out=self.pair_delta)
+        np.multiply(self.pair_delta, self.pair_delta, out=self.pair_delta)
+        np.sum(self.pair_delta, axis=2, out=self.distances)
+        np.sqrt(self.distances, out=self.distances)
+
+        np.subtract(self.fingers, self.anchors, out=self.radial)
+        np.multiply(self.radial, self.radial, out=self.radial)
+        np.sum(self.radial_xy, axis=2, out=self.reach)
+        np.multiply(self.reach[1], self.extension_squared, out=self.reach[1])
+        np.greater(self.reach[0], self.reach[1], out=self.extended)
+
+        g = self.gathered
+        wrist_x, wrist_y = float(g[WRIST_ROW, 0]), float(g[WRIST_ROW, 1])
+        index_x, index_y = float(g[INDEX_MCP_ROW, 0]) - wrist_x, float(g[INDEX_MCP_ROW, 1]) - wrist_y
+        pinky_x, pinky_y = float(g[PINKY_MCP_ROW, 0]) - wrist_x, float(g[PINKY_MCP_ROW, 1]) - wrist_y
+        size = math.hypot(float(g[MIDDLE_MCP_ROW, 0]) - wrist_x, float(g[MIDDLE_MCP_ROW, 1]) - wrist_y)
+        self.hand_size = size
+        self.palm_facing = (index_x * pinky_y - index_y * pinky_x) / (size * size) if size > 0 else 0.0
+
+    def update(self, points, timestamp: float) -> int:
+        self.features(points)
+        events = 0
+        threshold = self.pinch_ratio * self.hand_size
+        release = threshold * self.release_ratio
+        pinch = float(self.distances[THUMB, INDEX])
+        right = float(self.distances[THUMB, MIDDLE])
+
+        if self.pinched:
+            if pinch > release:
+                self.pinched = False
+                events |= GESTURE_RELEASE
+        elif (pinch < threshold and pinch < right and not self.scrolling
+              and timestamp - self.last_press > self.cooldown):
+            self.pinched = True
+            self.last_press = timestamp
+            events |= GESTURE_PRESS
+
+        if self.right_pinched:
+            if right > release:
+                self.right_pinched = False
+        elif right < threshold and right < pinch and not self.pinched:
+            self.right_pinched = True
+            events |= GESTURE_RIGHT_CLICK
+
+        events |= self._scroll()
+        events |= self._wave(timestamp)
+        return events
+
+    def _scroll(self) -> int:
+        extended = self.extended
+        pose = (extended[INDEX] and extended[MIDDLE] and not extended[RING] and not extended[PINKY]
+                and not self.pinched)
+        tips_y = (float(self.gathered[INDEX, 1]) + float(self.gathered[MIDDLE, 1])) / 2
+        if pose == self.scrolling:
+            self.pose_count = 0
+        else:
+            self.pose_count += 1
+            if self.pose_count >= self.pose_frames:
+                self.scrolling = bool(pose)
+                self.pose_count = 0
+                self.scroll_origin = tips_y
+        if not self.scrolling:
+            return 0
+
+        steps = int((self.scroll_origin - tips_y) / self.scroll_step)
+        if not steps:
+            return 0
+        self.scroll_origin -= steps * self.scroll_step
+        self.scroll_steps = steps
+        return GESTURE_SCROLL
+
+    def _wave(self, timestamp: float) -> int:
+        if not (self.extended.all() and abs(self.palm_facing) > self.min_palm_facing
+                and timestamp - self.last_wave > self.wave_cooldown):
+            if self.wave_tracking:
+                self.reset_wave()
+            return 0
+
+        x = float(self.gathered[WRIST_ROW, 0])
+        if not self.wave_tracking:
+            self.wave_tracking = True
+            self.wave_extreme = x
+            return 0
+
+        delta = x - self.wave_extreme
+        if self.wave_direction == 0:
+            if abs(delta) > self.wave_amplitude:
+                self.wave_direction = 1 if delta > 0 else -1
+                self.wave_extreme = x
+        elif delta * self.wave_direction > 0:
+            self.wave_extreme = x
+        elif -delta * self.wave_direction > self.wave_amplitude:
+            size = len(self.swings)
+            self.swings[self.swing_count % size] = timestamp
+            self.swing_count += 1
+            self.wave_direction = -self.wave_direction
+            self.wave_extreme = x
+            if self.swing_count >= size and timestamp - self.swings[self.swing_count % size] <= self.wave_window:
+                self.last_wave = timestamp
+                self.reset_wave()
+                return GESTURE_WAVE
+        return 0
+
+    def lost(self) -> int:
+        events = GESTURE_RELEASE if self.pinched else 0
+        self.reset()
+        return events
+
+def synthetic_hands(frames: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.3, 0.7, (NUM_LANDMARKS, 3)).astype(np.float32)
+    drift = np.sin(np.linspace(0, 20, frames, dtype=np.float32))[:, None, None] * 0.1
+    noise = rng.normal(0, 0.01, (frames, NUM_LANDMARKS, 3)).astype(np.float32)
+    return base + drift + noise
+
+def benchmark(engine: GestureEngine, frames: int = 20000):
+    hands = synthetic_hands(frames)
+    timings = np.empty(frames)
+    for i in range(min(frames, 100)):
+        engine.update(hands[i], i / 60)
+
+    for i in range(frames):
+        start = time.perf_counter()
+        engine.update(hands[i], i / 60)
+        timings[i] = time.perf_counter() - start
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    for i in range(frames):
+        engine.update(hands[i], i / 60)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'mean_us': float(timings.mean() * 1e6),
+        'p99_us': float(np.percentile(timings, 99) * 1e6),
+        'retained_bytes': current - baseline,
+        'peak_bytes': peak - baseline,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер скорости распознавания жестов")
+    parser.add_argument('--frames', type=int, default=20000)
+    args = parser.parse_args()
+
+    result = benchmark(GestureEngine(), args.frames)
+    print(f"[+] Жесты: {result['mean_us']:.1f} мкс на кадр (p99 {result['p99_us']:.1f} мкс), "
+          f"память: пик {result['peak_bytes']} байт, удержано {result['retained_bytes']} байт")
+
+if __name__ == "__main__":
+    main()
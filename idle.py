@@ -0,0 +1,49 @@
+import cv2
+import numpy as np
+
+class IdleScheduler:
+    def __init__(self, idle_after: int = 90, stride: int = 6, size=(80, 45),
+                 threshold: int = 12, min_fraction: float = 0.004):
+        self.idle_after = idle_after
+        self.stride = max(1, stride)
+        self.size = size
+        self.threshold = threshold
+        self.min_changed = max(1, int(size[0] * size[1] * min_fraction))
+        self.active = False
+        self.missed = 0
+        self.small = np.empty((size[1], size[0], 3), np.uint8)
+        self.previous = np.zeros((size[1], size[0]), np.uint8)
+        self.current = np.zeros_like(self.previous)
+        self.diff = np.zeros_like(self.previous)
+
+    def _downsample(self, image, out):
+        cv2.resize(image, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=out)
+
+    def update(self, detected: bool, image) -> bool:
+        if detected:
+            self.missed = 0
+            return False
+        self.missed += 1
+        if self.missed < self.idle_after:
+            return False
+        self.missed = 0
+        self._downsample(image, self.previous)
+        return True
+
+    def motion(self, image) -> bool:
+        self._downsample(image, self.current)
+        cv2.absdiff(self.current, self.previous, dst=self.diff)
+        self.previous, self.current = self.current, self.previous
+        return np.count_nonzero(self.diff > self.threshold) >= self.min_changed
+
+def add_idle_arguments(parser):
+    parser.add_argument('--idle-after', type=int, default=90,
+                        help="кадров без руки до перехода в режим ожидания (0 - не засыпать)")
+    parser.add_argument('--idle-stride', type=int, default=6,
+                        help="в режиме ожидания снижать частоту кадров камеры в N раз")
+
+def idle_from_args(args):
+    if args.idle_after <= 0:
+        return None
+    return IdleScheduler(args.idle_after, args.idle_stride)
@@ -0,0 +1,283 @@
+import argparse
+import math
+import subprocess
+import time
+
+BUTTON_LEFT = 1
+BUTTON_MIDDLE = 2
+BUTTON_RIGHT = 3
+BUTTON_WHEEL_UP = 4
+BUTTON_WHEEL_DOWN = 5
+
+class InjectionBackend:
+    name = "base"
+
+    def __init__(self, screen_width: int, screen_height: int, relative: bool = False):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.relative = relative
+        self.last_pos = None
+        self.events_sent = 0
+
+    def move(self, x: int, y: int):
+        x, y = int(x), int(y)
+        if self.relative and self.last_pos is None:
+            self.last_pos = self.pointer_position() or (x, y)
+        if self.last_pos == (x, y):
+            return
+        if self.relative:
+            self._move_relative(x - self.last_pos[0], y - self.last_pos[1])
+        else:
+            self._move_absolute(x, y)
+        self.last_pos = (x, y)
+        self.events_sent += 1
+
+    def press(self, button: int = BUTTON_LEFT):
+        self._button(button, True)
+        self.events_sent += 1
+
+    def release(self, button: int = BUTTON_LEFT):
+        self._button(button, False)
+        self.events_sent += 1
+
+    def click(self, button: int = BUTTON_LEFT):
+        self.press(button)
+        self.release(button)
+
+    def scroll(self, steps: int):
+        if steps:
+            self._scroll(steps)
+            self.events_sent += 1
+
+    def close(self):
+        pass
+
+    def pointer_position(self):
+        return None
+
+    def _move_absolute(self, x: int, y: int):
+        raise NotImplementedError
+
+    def _move_relative(self, dx: int, dy: int):
+        raise NotImplementedError
+
+    def _button(self, button: int, pressed: bool):
+        raise NotImplementedError
+
+    def _scroll(self, steps: int):
+        raise NotImplementedError
+
+class NullBackend(InjectionBackend):
+    name = "null"
+
+    def _move_absolute(self, x: int, y: int):
+        pass
+
+    def _move_relative(self, dx: int, dy: int):
+        pass
+
+    def _button(self, button: int, pressed: bool):
+        pass
+
+    def _scroll(self, steps: int):
+        pass
+
+class NullMouseMover:
+    def __init__(self, screen_width: int = 1920, screen_height: int = 1080):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.backend = NullBackend(screen_width, screen_height)
+
+    def update(self, target_x: int, target_y: int):
+        self.backend.move(target_x, target_y)
+
+    def click(self):
+        self.backend.click()
+
+    def press(self):
+        self.backend.press(BUTTON_LEFT)
+
+    def release(self):
+        self.backend.release(BUTTON_LEFT)
+
+    def right_click(self):
+        self.backend.click(BUTTON_RIGHT)
+
+    def scroll(self, steps: int):
+        self.backend.scroll(steps)
+
+    def close(self):
+        self.backend.close()
+
+class XdotoolBackend(InjectionBackend):
+    name = "xdotool"
+
+    def __init__(self, screen_width: int, screen_height: int, relative: bool = False):
+        super().__init__(screen_width, screen_height, relative)
+        subprocess.run(['which', 'xdotool'], check=True, stdout=subprocess.DEVNULL)
+
+    def _run(self, *args):
+        try:
+            subprocess.run(['xdotool', *args], check=True)
+        except:
+            pass
+
+    def pointer_position(self):
+        try:
+            output = subprocess.check_output(['xdotool', 'getmouselocation', '--shell'], text=True)
+            values = dict(line.split('=', 1) for line in output.splitlines() if '=' in line)
+            return int(values['X']), int(values['Y'])
+        except Exception:
+            return None
+
+    def _move_absolute(self, x: int, y: int):
+        self._run('mousemove', str(x), str(y))
+
+    def _move_relative(self, dx: int, dy: int):
+        self._run('mousemove_relative', '--', str(dx), str(dy))
+
+    def _button(self, button: int, pressed: bool):
+        self._run('mousedown' if pressed else 'mouseup', str(button))
+
+    def _scroll(self, steps: int):
+        self._run('click', '--repeat', str(abs(steps)), str(BUTTON_WHEEL_UP if steps > 0 else BUTTON_WHEEL_DOWN))
+
+class UinputBackend(InjectionBackend):
+    name = "uinput"
+
+    def __init__(self, screen_width: int, screen_height: int, relative: bool = False):
+        super().__init__(screen_width, screen_height, relative)
+        from evdev import UInput, AbsInfo, ecodes
+        self.ecodes = ecodes
+        self.buttons = {
+            BUTTON_LEFT: ecodes.BTN_LEFT,
+            BUTTON_MIDDLE: ecodes.BTN_MIDDLE,
+            BUTTON_RIGHT: ecodes.BTN_RIGHT,
+        }
+        capabilities = {ecodes.EV_KEY: list(self.buttons.values())}
+        if relative:
+            capabilities[ecodes.EV_REL] = [ecodes.REL_X, ecodes.REL_Y, ecodes.REL_WHEEL]
+        else:
+            capabilities[ecodes.EV_REL] = [ecodes.REL_WHEEL]
+            capabilities[ecodes.EV_ABS] = [
+                (ecodes.ABS_X, AbsInfo(0, 0, screen_width - 1, 0, 0, 0)),
+                (ecodes.ABS_Y, AbsInfo(0, 0, screen_height - 1, 0, 0, 0)),
+            ]
+        self.device = UInput(capabilities, name="WRHT virtual pointer")
+
+    def _move_absolute(self, x: int, y: int):
+        self.device.write(self.ecodes.EV_ABS, self.ecodes.ABS_X, min(max(x, 0), self.screen_width - 1))
+        self.device.write(self.ecodes.EV_ABS, self.ecodes.ABS_Y, min(max(y, 0), self.screen_height - 1))
+        self.device.syn()
+
+    def _move_relative(self, dx: int, dy: int):
+        if dx:
+            self.device.write(self.ecodes.EV_REL, self.ecodes.REL_X, dx)
+        if dy:
+            self.device.write(self.ecodes.EV_REL, self.ecodes.REL_Y, dy)
+        self.device.syn()
+
+    def _button(self, button: int, pressed: bool):
+        self.device.write(self.ecodes.EV_KEY, self.buttons[button], 1 if pressed else 0)
+        self.device.syn()
+
+    def _scroll(self, steps: int):
+        self.device.write(self.ecodes.EV_REL, self.ecodes.REL_WHEEL, steps)
+        self.device.syn()
+
+    def close(self):
+        self.device.close()
+
+class XTestBackend(InjectionBackend):
+    name = "xtest"
+
+    def __init__(self, screen_width: int, screen_height: int, relative: bool = False):
+        super().__init__(screen_width, screen_height, relative)
+        from Xlib import X, display
+        from Xlib.ext import xtest
+        self.X = X
+        self.xtest = xtest
+        self.display = display.Display()
+        if not self.display.query_extension('XTEST').present:
+            raise RuntimeError("XTEST extension is not available")
+
+    def pointer_position(self):
+        pointer = self.display.screen().root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def _move_absolute(self, x: int, y: int):
+        self.xtest.fake_input(self.display, self.X.MotionNotify, x=x, y=y)
+        self.display.flush()
+
+    def _move_relative(self, dx: int, dy: int):
+        self.xtest.fake_input(self.display, self.X.MotionNotify, detail=1, x=dx, y=dy)
+        self.display.flush()
+
+    def _button(self, button: int, pressed: bool):
+        event = self.X.ButtonPress if pressed else self.X.ButtonRelease
+        self.xtest.fake_input(self.display, event, button)
+        self.display.flush()
+
+    def _scroll(self, steps: int):
+        button = BUTTON_WHEEL_UP if steps > 0 else BUTTON_WHEEL_DOWN
+        for _ in range(abs(steps)):
+            self.xtest.fake_input(self.display, self.X.ButtonPress, button)
+            self.xtest.fake_input(self.display, self.X.ButtonRelease, button)
+        self.display.flush()
+
+    def close(self):
+        self.display.close()
+
+BACKENDS = {
+    'uinput': UinputBackend,
+    'xtest': XTestBackend,
+    'xdotool': XdotoolBackend,
+    'null': NullBackend,
+}
+
+def create_backend(name: str, screen_width: int, screen_height: int, relative: bool = False) -> InjectionBackend:
+    if name != 'auto':
+        return BACKENDS[name](screen_width, screen_height, relative)
+
+    for candidate in ('uinput', 'xtest', 'xdotool'):
+        try:
+            return BACKENDS[candidate](screen_width, screen_height, relative)
+        except Exception as e:
+            print(f"[-] Бэкенд {candidate} недоступен: {e}")
+    raise RuntimeError("Нет доступного бэкенда ввода")
+
+def benchmark(backend: InjectionBackend, events: int = 2000) -> float:
+    center_x, center_y = backend.screen_width // 2, backend.screen_height // 2
+    radius = min(center_x, center_y) // 2
+    sent = backend.events_sent
+    start = time.perf_counter()
+    for i in range(events):
+        angle = 2 * math.pi * i / 360
+        backend.move(center_x + radius * math.cos(angle), center_y + radius * math.sin(angle))
+    elapsed = time.perf_counter() - start
+    return (backend.events_sent - sent) / elapsed if elapsed > 0 else float('inf')
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер скорости бэкендов ввода")
+    parser.add_argument('--backend', action='append', choices=list(BACKENDS),
+                        help="бэкенд для замера (по умолчанию все)")
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--relative', action='store_true')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    args = parser.parse_args()
+
+    for name in args.backend or list(BACKENDS):
+        try:
+            backend = create_backend(name, args.width, args.height, args.relative)
+        except Exception as e:
+            print(f"{name:8s} недоступен: {e}")
+            continue
+        try:
+            rate = benchmark(backend, args.events)
+            print(f"{name:8s} {rate:12.0f} событий/с")
+        finally:
+            backend.close()
+
+if __name__ == "__main__":
+    main()
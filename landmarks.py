@@ -0,0 +1,54 @@
+from enum import IntEnum
+from typing import NamedTuple
+import numpy as np
+
+class HandLandmark(IntEnum):
+    WRIST = 0
+    THUMB_CMC = 1
+    THUMB_MCP = 2
+    THUMB_IP = 3
+    THUMB_TIP = 4
+    INDEX_FINGER_MCP = 5
+    INDEX_FINGER_PIP = 6
+    INDEX_FINGER_DIP = 7
+    INDEX_FINGER_TIP = 8
+    MIDDLE_FINGER_MCP = 9
+    MIDDLE_FINGER_PIP = 10
+    MIDDLE_FINGER_DIP = 11
+    MIDDLE_FINGER_TIP = 12
+    RING_FINGER_MCP = 13
+    RING_FINGER_PIP = 14
+    RING_FINGER_DIP = 15
+    RING_FINGER_TIP = 16
+    PINKY_MCP = 17
+    PINKY_PIP = 18
+    PINKY_DIP = 19
+    PINKY_TIP = 20
+
+NUM_LANDMARKS = len(HandLandmark)
+
+class Point(NamedTuple):
+    x: float
+    y: float
+    z: float
+
+    def HasField(self, name):
+        return False
+
+class Results(NamedTuple):
+    multi_hand_landmarks: list
+
+class LandmarkList:
+    __slots__ = ('landmark', 'array')
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+        self.landmark = [Point(*row) for row in array.tolist()]
+
+def landmarks_to_array(hand_landmarks, out: np.ndarray) -> np.ndarray:
+    array = getattr(hand_landmarks, 'array', None)
+    if array is not None:
+        np.copyto(out, array)
+    else:
+        out[:] = [(landmark.x, landmark.y, landmark.z) for landmark in hand_landmarks.landmark]
+    return out
@@ -0,0 +1,294 @@
+import glob
+import math
+import re
+import subprocess
+import sys
+import time
+from collections import deque
+from typing import List, NamedTuple, Optional
+import cv2
+import numpy as np
+from gestures import GESTURE_PRESS
+from landmarks import NUM_LANDMARKS, HandLandmark
+
+XRANDR_OUTPUT = re.compile(r'^(\S+) connected (primary )?(\d+)x(\d+)\+(-?\d+)\+(-?\d+)')
+MONITORINFOF_PRIMARY = 1
+SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN, SM_CMONITORS = 76, 77, 78, 79, 80
+
+class Monitor(NamedTuple):
+    name: str
+    x: int
+    y: int
+    width: int
+    height: int
+    primary: bool = False
+
+    def __str__(self):
+        return f"{self.name} {self.width}x{self.height}+{self.x}+{self.y}"
+
+def xrandr_monitors() -> List[Monitor]:
+    try:
+        output = subprocess.check_output(['xrandr', '--query'], stderr=subprocess.DEVNULL, timeout=2).decode()
+    except Exception:
+        return []
+    monitors = []
+    for line in output.splitlines():
+        match = XRANDR_OUTPUT.match(line)
+        if match:
+            name, primary, width, height, x, y = match.groups()
+            monitors.append(Monitor(name, int(x), int(y), int(width), int(height), bool(primary)))
+    return monitors
+
+def windows_monitors() -> List[Monitor]:
+    try:
+        import win32api
+        monitors = []
+        for handle, _, _ in win32api.EnumDisplayMonitors():
+            info = win32api.GetMonitorInfo(handle)
+            left, top, right, bottom = info['Monitor']
+            monitors.append(Monitor(info['Device'], left, top, right - left, bottom - top,
+                                    bool(info['Flags'] & MONITORINFOF_PRIMARY)))
+        return monitors
+    except Exception:
+        return []
+
+def list_monitors() -> List[Monitor]:
+    monitors = windows_monitors() if sys.platform == 'win32' else xrandr_monitors()
+    if not monitors:
+        return [Monitor('screen', 0, 0, 1920, 1080, True)]
+    if not any(monitor.primary for monitor in monitors):
+        monitors[0] = monitors[0]._replace(primary=True)
+    return monitors
+
+def layout_fingerprint() -> Optional[str]:
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            metrics = ctypes.windll.user32.GetSystemMetrics
+            return ':'.join(str(metrics(index)) for index in (SM_CMONITORS, SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN,
+                                                               SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN))
+        except Exception:
+            return None
+    parts = []
+    for path in sorted(glob.glob('/sys/class/drm/card*-*/status')):
+        try:
+            with open(path) as f:
+                parts.append(f"{path}:{f.read().strip()}")
+        except OSError:
+            pass
+    return ';'.join(parts) or None
+
+def bounding_monitor(monitors: List[Monitor], name: str = 'desktop') -> Monitor:
+    left = min(monitor.x for monitor in monitors)
+    top = min(monitor.y for monitor in monitors)
+    right = max(monitor.x + monitor.width for monitor in monitors)
+    bottom = max(monitor.y + monitor.height for monitor in monitors)
+    return Monitor(name, left, top, right - left, bottom - top, True)
+
+class MonitorLayout:
+    def __init__(self, monitors: List[Monitor] = None, check_interval: float = 2.0):
+        self.static = monitors is not None
+        self.monitors = monitors if self.static else list_monitors()
+        self.fingerprint = None if self.static else layout_fingerprint()
+        self.check_interval = check_interval
+        self.checked = time.monotonic()
+        self.version = 0
+
+    def refresh(self) -> bool:
+        now = time.monotonic()
+        if self.static or self.fingerprint is None or now - self.checked < self.check_interval:
+            return False
+        self.checked = now
+        fingerprint = layout_fingerprint()
+        if fingerprint == self.fingerprint:
+            return False
+        self.fingerprint = fingerprint
+        self.monitors = list_monitors()
+        self.version += 1
+        print("[+] Мониторы изменились: " + ", ".join(map(str, self.monitors)))
+        return True
+
+    def desktop(self) -> Monitor:
+        return bounding_monitor(self.monitors)
+
+    def target(self, name: str = 'primary') -> Monitor:
+        if name == 'desktop':
+            return self.desktop()
+        if name == 'primary':
+            return next(monitor for monitor in self.monitors if monitor.primary)
+        if name.isdigit() and int(name) < len(self.monitors):
+            return self.monitors[int(name)]
+        for monitor in self.monitors:
+            if monitor.name == name:
+                return monitor
+        print(f"[-] Монитор {name} не найден, используется основной")
+        return self.target('primary')
+
+def margin_transform(margin) -> np.ndarray:
+    margin = np.asarray(margin, float)
+    scale = 1 / (1 - 2 * margin)
+    return np.array([[scale[0], 0, -margin[0] * scale[0]],
+                     [0, scale[1], -margin[1] * scale[1]],
+                     [0, 0, 1]])
+
+def acceleration_table(low_gain: float = 0.6, high_gain: float = 1.8, bins: int = 64) -> np.ndarray:
+    speed = np.linspace(0, 1, bins)
+    curve = speed * speed * (3 - 2 * speed)
+    return low_gain + (high_gain - low_gain) * curve
+
+class CursorMapping:
+    def __init__(self, layout: MonitorLayout, target: str = 'primary', margin=(0.1, 0.1), calibration=None,
+                 acceleration: bool = False, max_speed: float = 3.0, recenter: float = 0.05):
+        self.layout = layout
+        self.target = target
+        self.margin = margin
+        self.calibration = None if calibration is None else np.asarray(calibration, float)
+        self.weights = np.zeros(NUM_LANDMARKS)
+        self.weights[HandLandmark.MIDDLE_FINGER_TIP] = 2.0
+        self.weights[HandLandmark.WRIST] -= 0.5
+        self.weights[HandLandmark.MIDDLE_FINGER_MCP] -= 0.5
+        self.table = acceleration_table() if acceleration else None
+        self.speed_scale = (len(self.table) - 1) / max_speed if acceleration else 0.0
+        self.recenter = recenter
+        self.projected = np.empty(3)
+        self.pointer = np.empty(3)
+        self.monitor = None
+        self.version = -1
+        self.reset()
+        self.update_matrix()
+
+    def reset(self):
+        self.cursor = None
+        self.last_target = None
+        self.last_time = None
+
+    def update_matrix(self):
+        self.version = self.layout.version
+        self.monitor = monitor = self.layout.target(self.target)
+        placement = np.array([[monitor.width, 0, monitor.x], [0, monitor.height, monitor.y], [0, 0, 1]], float)
+        transform = self.calibration if self.calibration is not None else margin_transform(self.margin)
+        self.matrix = placement @ transform
+        self.operator = np.zeros((3, NUM_LANDMARKS, 3))
+        self.operator[:, :, :2] = self.matrix[:, None, :2] * self.weights[None, :, None]
+        self.operator = self.operator.reshape(3, -1)
+        self.bias = self.matrix[:, 2] * self.weights.sum()
+        self.bounds = (float(monitor.x), float(monitor.y), float(monitor.x + monitor.width - 1),
+                       float(monitor.y + monitor.height - 1))
+        self.reset()
+
+    def set_calibration(self, calibration):
+        self.calibration = None if calibration is None else np.asarray(calibration, float)
+        self.update_matrix()
+
+    def set_margin(self, margin):
+        self.margin = margin
+        self.update_matrix()
+
+    def hand_pointer(self, points) -> np.ndarray:
+        np.dot(self.weights, points, out=self.pointer)
+        return self.pointer[:2]
+
+    def map(self, points, timestamp: float = 0.0):
+        if self.layout.refresh() or self.version != self.layout.version:
+            self.update_matrix()
+        np.dot(self.operator, points.reshape(-1), out=self.projected)
+        self.projected += self.bias
+        x = self.projected[0] / self.projected[2]
+        y = self.projected[1] / self.projected[2]
+        if self.table is not None:
+            x, y = self.accelerate(x, y, timestamp)
+        left, top, right, bottom = self.bounds
+        return min(max(float(x), left), right), min(max(float(y), top), bottom)
+
+    def accelerate(self, x: float, y: float, timestamp: float):
+        if self.cursor is None or timestamp <= self.last_time:
+            self.cursor = [x, y]
+        else:
+            dx, dy = x - self.last_target[0], y - self.last_target[1]
+            speed = math.hypot(dx / self.monitor.width, dy / self.monitor.height) / (timestamp - self.last_time)
+            gain = self.table[min(int(speed * self.speed_scale), len(self.table) - 1)]
+            self.cursor[0] += gain * dx + self.recenter * (x - self.cursor[0])
+            self.cursor[1] += gain * dy + self.recenter * (y - self.cursor[1])
+        self.last_target = (x, y)
+        self.last_time = timestamp
+        return self.cursor[0], self.cursor[1]
+
+CALIBRATION_TARGETS = [
+    ((0.0, 0.0), "левый верхний угол"),
+    ((1.0, 0.0), "правый верхний угол"),
+    ((1.0, 1.0), "правый нижний угол"),
+    ((0.0, 1.0), "левый нижний угол"),
+    ((0.5, 0.5), "центр"),
+]
+
+class MappingCalibration:
+    def __init__(self, mapping: CursorMapping, model: str = 'homography', samples: int = 10):
+        self.mapping = mapping
+        self.model = model
+        self.recent = deque(maxlen=samples)
+        self.measured = []
+
+    def start(self):
+        print(f"\n[+] Калибровка: {self.mapping.monitor}. Наведите руку на каждую точку и сожмите пальцы")
+        self.prompt()
+
+    def prompt(self):
+        print(f"- {CALIBRATION_TARGETS[len(self.measured)][1]} экрана")
+
+    def update(self, points, events: int) -> bool:
+        self.recent.append(self.mapping.hand_pointer(points).copy())
+        if not events & GESTURE_PRESS or len(self.recent) < self.recent.maxlen // 2:
+            return False
+        self.measured.append(np.median(self.recent, axis=0))
+        self.recent.clear()
+        if len(self.measured) < len(CALIBRATION_TARGETS):
+            self.prompt()
+            return False
+
+        calibration = fit_calibration(self.measured, self.model)
+        if calibration is None:
+            print("[-] Калибровка не удалась, точки слишком близко, повторите")
+            self.measured.clear()
+            self.prompt()
+            return False
+        self.mapping.set_calibration(calibration)
+        save_calibration(calibration, self.model)
+        print("[+] Калибровка сохранена\n")
+        return True
+
+def fit_calibration(measured, model: str = 'homography'):
+    source = np.asarray(measured, np.float32)
+    target = np.array([point for point, _ in CALIBRATION_TARGETS], np.float32)[:len(source)]
+    if model == 'affine':
+        affine, _ = cv2.estimateAffine2D(source, target, method=0)
+        return None if affine is None else np.vstack([affine, [0, 0, 1]])
+    homography, _ = cv2.findHomography(source, target, 0)
+    return homography
+
+def load_calibration():
+    from cameras import load_json
+    calibration = load_json('mapping.json').get('calibration')
+    return np.array(calibration, float) if calibration else None
+
+def save_calibration(calibration, model: str):
+    from cameras import save_json
+    save_json('mapping.json', {'model': model, 'calibration': np.asarray(calibration).tolist()})
+
+def add_mapping_arguments(parser):
+    parser.add_argument('--monitor', default='primary',
+                        help="монитор для курсора: primary, desktop (все мониторы), номер или имя выхода")
+    parser.add_argument('--calibrate-mapping', action='store_true',
+                        help="откалибровать зону руки по углам экрана при запуске")
+    parser.add_argument('--mapping-model', default='homography', choices=['homography', 'affine'],
+                        help="модель калибровки")
+    parser.add_argument('--acceleration', action='store_true',
+                        help="нелинейное ускорение: медленные движения точнее, быстрые дальше")
+
+def mapping_options(args):
+    return {
+        'monitor': args.monitor,
+        'calibration': None if args.calibrate_mapping else load_calibration(),
+        'calibrate_mapping': args.calibrate_mapping,
+        'mapping_model': args.mapping_model,
+        'acceleration': args.acceleration,
+    }
@@ -0,0 +1,247 @@
+import bisect
+import csv
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BUCKET_BOUNDS = [1e-6 * 1.08 ** i for i in range(216)]
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def copy(self):
+        other = Histogram()
+        other.counts = list(self.counts)
+        other.count = self.count
+        other.total = self.total
+        other.max = self.max
+        return other
+
+    def since(self, previous):
+        window = Histogram()
+        if previous is None:
+            return self.copy()
+        window.counts = [a - b for a, b in zip(self.counts, previous.counts)]
+        window.count = self.count - previous.count
+        window.total = self.total - previous.total
+        window.max = 0.0
+        for index in range(len(window.counts) - 1, -1, -1):
+            if window.counts[index]:
+                window.max = min(BUCKET_BOUNDS[index], self.max) if index < len(BUCKET_BOUNDS) else self.max
+                break
+        return window
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKET_BOUNDS[index - 1] if index > 0 else 0.0
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+        return self.max
+
+class StageTimer:
+    __slots__ = ('histogram', 'stats', 'start')
+
+    def __init__(self, stats, histogram):
+        self.stats = stats
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.stats.enabled:
+            self.histogram.add(time.perf_counter() - self.start)
+        return False
+
+class StageStats:
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.enabled = True
+        self.started = time.monotonic()
+
+    def histogram(self, stage: str) -> Histogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+        return histogram
+
+    def add(self, stage: str, seconds: float):
+        if self.enabled:
+            self.histogram(stage).add(seconds)
+
+    def time(self, stage: str) -> StageTimer:
+        return StageTimer(self, self.histogram(stage))
+
+    def count(self, name: str, value: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def reset(self):
+        self.histograms.clear()
+        self.counters.clear()
+        self.started = time.monotonic()
+
+    def snapshot(self):
+        return {
+            'histograms': {stage: h.copy() for stage, h in list(self.histograms.items())},
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+            'time': time.monotonic(),
+        }
+
+    def summary(self, previous=None):
+        current = self.snapshot()
+        old_histograms = previous['histograms'] if previous else {}
+        old_counters = previous['counters'] if previous else {}
+
+        stages = {}
+        for stage, histogram in current['histograms'].items():
+            window = histogram.since(old_histograms.get(stage))
+            if not window.count:
+                continue
+            p50, p95, p99 = (window.quantile(q) * 1000 for q in QUANTILES)
+            stages[stage] = {
+                'count': window.count,
+                'mean_ms': window.total / window.count * 1000,
+                'p50_ms': p50,
+                'p95_ms': p95,
+                'p99_ms': p99,
+            }
+
+        counters = {name: value - old_counters.get(name, 0) for name, value in current['counters'].items()}
+        frames = counters.get('frames', 0)
+        return {
+            'stages': stages,
+            'counters': counters,
+            'gauges': current['gauges'],
+            'detection_rate': counters.get('detections', 0) / frames if frames else 0.0,
+        }
+
+class MetricsExporter:
+    def __init__(self, stats: StageStats, path: str, interval: float = 5.0):
+        self.stats = stats
+        self.path = path
+        self.interval = interval
+        self.csv = path.endswith('.csv')
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._loop, name="metrics", daemon=True)
+        self.previous = None
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join(timeout=1.0)
+        self.export()
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.export()
+
+    def export(self):
+        snapshot = self.stats.snapshot()
+        summary = self.stats.summary(self.previous)
+        self.previous = snapshot
+        timestamp = time.time()
+
+        with open(self.path, 'a', newline='') as f:
+            if not self.csv:
+                f.write(json.dumps({'time': timestamp, **summary}) + '\n')
+                return
+            writer = csv.writer(f)
+            if f.tell() == 0:
+                writer.writerow(['time', 'metric', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'])
+            for stage, values in summary['stages'].items():
+                writer.writerow([f"{timestamp:.3f}", stage, values['count'], f"{values['mean_ms']:.3f}",
+                                 f"{values['p50_ms']:.3f}", f"{values['p95_ms']:.3f}", f"{values['p99_ms']:.3f}"])
+            for name, value in {**summary['counters'], **summary['gauges']}.items():
+                writer.writerow([f"{timestamp:.3f}", name, value, '', '', '', ''])
+            writer.writerow([f"{timestamp:.3f}", 'detection_rate', f"{summary['detection_rate']:.3f}", '', '', '', ''])
+
+def prometheus_text(stats: StageStats) -> str:
+    snapshot = stats.snapshot()
+    lines = ['# TYPE wrht_stage_seconds summary']
+    for stage, histogram in snapshot['histograms'].items():
+        for q in QUANTILES:
+            lines.append(f'wrht_stage_seconds{{stage="{stage}",quantile="{q}"}} {histogram.quantile(q):.6f}')
+        lines.append(f'wrht_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}')
+        lines.append(f'wrht_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+    for name, value in snapshot['counters'].items():
+        lines.append(f'# TYPE wrht_{name}_total counter')
+        lines.append(f'wrht_{name}_total {value}')
+    for name, value in snapshot['gauges'].items():
+        lines.append(f'# TYPE wrht_{name} gauge')
+        lines.append(f'wrht_{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+def serve_metrics(stats: StageStats, port: int, host: str = '127.0.0.1'):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text(stats).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+def add_metrics_arguments(parser):
+    parser.add_argument('--metrics', help="периодически писать метрики в файл (.jsonl или .csv)")
+    parser.add_argument('--metrics-interval', type=float, default=5.0, help="период выгрузки метрик, с")
+    parser.add_argument('--metrics-port', type=int, help="отдавать метрики в формате Prometheus на localhost:PORT/metrics")
+
+def start_metrics(stats: StageStats, args):
+    exporters = []
+    if args.metrics:
+        exporter = MetricsExporter(stats, args.metrics, args.metrics_interval)
+        exporter.start()
+        exporters.append(exporter)
+    if args.metrics_port:
+        server = serve_metrics(stats, args.metrics_port)
+        print(f"[+] Метрики: http://127.0.0.1:{args.metrics_port}/metrics")
+        exporters.append(server)
+    return exporters
+
+def stop_metrics(exporters):
+    for exporter in exporters:
+        if isinstance(exporter, MetricsExporter):
+            exporter.stop()
+        else:
+            exporter.shutdown()
+            exporter.server_close()
@@ -0,0 +1,271 @@
+import multiprocessing
+import signal
+import struct
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from capture import flip_to_rgb
+from landmarks import NUM_LANDMARKS, LandmarkList
+from roi import crop_model
+
+SLOTS = 3
+HEADER = struct.Struct('<qddi')
+PACKET_SIZE = HEADER.size + NUM_LANDMARKS * 3 * 4
+
+class SharedFrameRing:
+    def __init__(self, context):
+        self.condition = context.Condition()
+        self.latest = context.RawValue('i', -1)
+        self.reading = context.RawValue('i', -1)
+        self.sequence = context.RawValue('q', 0)
+        self.dropped = context.RawValue('q', 0)
+        self.closed = context.RawValue('b', 0)
+        self.timestamps = context.RawArray('d', SLOTS)
+        self.sequences = context.RawArray('q', SLOTS)
+        self.shm = None
+        self.frames = None
+        self.owner = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(shm=None, frames=None, owner=False)
+        return state
+
+    def allocate(self, shape):
+        self.shm = shared_memory.SharedMemory(create=True, size=SLOTS * int(np.prod(shape)))
+        self.owner = True
+        self.frames = np.ndarray((SLOTS,) + tuple(shape), np.uint8, buffer=self.shm.buf)
+        return self.shm.name
+
+    def attach(self, name, shape):
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.frames = np.ndarray((SLOTS,) + tuple(shape), np.uint8, buffer=self.shm.buf)
+
+    def write_slot(self) -> int:
+        with self.condition:
+            for slot in range(SLOTS):
+                if slot != self.latest.value and slot != self.reading.value:
+                    return slot
+
+    def publish(self, slot: int, timestamp: float):
+        with self.condition:
+            if self.latest.value >= 0:
+                self.dropped.value += 1
+            self.sequence.value += 1
+            self.sequences[slot] = self.sequence.value
+            self.timestamps[slot] = timestamp
+            self.latest.value = slot
+            self.condition.notify_all()
+
+    def acquire(self, timeout: float = 0.1):
+        with self.condition:
+            if self.latest.value < 0 and not self.closed.value:
+                self.condition.wait(timeout)
+            slot = self.latest.value
+            if slot < 0:
+                return None
+            self.latest.value = -1
+            self.reading.value = slot
+            self.condition.notify_all()
+            return slot, self.sequences[slot], self.timestamps[slot]
+
+    def wait_consumed(self, timeout: float = 0.1):
+        with self.condition:
+            while self.latest.value >= 0 and not self.closed.value:
+                self.condition.wait(timeout)
+
+    def release(self):
+        with self.condition:
+            self.reading.value = -1
+
+    def close(self):
+        with self.condition:
+            self.closed.value = 1
+            self.condition.notify_all()
+
+    def dispose(self):
+        self.frames = None
+        if self.shm is not None:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+            self.shm = None
+
+def capture_worker(ring, conn, stop, ready, source, opener):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    cap = opener(source)
+    success, image = cap.read()
+    conn.send(image.shape if success else None)
+    name = conn.recv() if success else None
+    if name is None:
+        cap.release()
+        ring.close()
+        return
+
+    ring.attach(name, image.shape)
+    while not ready.wait(0.1):
+        if stop.is_set():
+            break
+    slot = ring.write_slot()
+    ring.frames[slot][...] = image
+    ring.publish(slot, time.monotonic())
+    live = not isinstance(source, str)
+    while not stop.is_set():
+        if not live:
+            ring.wait_consumed()
+        slot = ring.write_slot()
+        target = ring.frames[slot]
+        success, image = cap.read(target)
+        timestamp = time.monotonic()
+        if not success:
+            if not live:
+                break
+            time.sleep(0.005)
+            continue
+        if image is not target:
+            target[...] = image
+        ring.publish(slot, timestamp)
+
+    ring.close()
+    cap.release()
+
+def inference_worker(ring, conn, stop, ready, roi):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import mediapipe
+    hands = mediapipe.solutions.hands.Hands(
+        max_num_hands=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7)
+    crop_hands = crop_model(mediapipe, roi.size) if roi is not None else None
+    message = conn.recv()
+    if message is None:
+        return
+    name, shape = message
+    ring.attach(name, shape)
+    hands.process(np.zeros(shape, np.uint8))
+    ready.set()
+
+    rgb = np.empty(shape, np.uint8)
+    packet = bytearray(PACKET_SIZE)
+    points = np.ndarray((NUM_LANDMARKS, 3), np.float32, buffer=packet, offset=HEADER.size)
+    while not stop.is_set():
+        acquired = ring.acquire()
+        if acquired is None:
+            if ring.closed.value:
+                break
+            continue
+
+        slot, sequence, timestamp = acquired
+        begin = time.perf_counter()
+        if roi is not None:
+            rgb_frame = roi.prepare(ring.frames[slot])
+        else:
+            rgb_frame = flip_to_rgb(ring.frames[slot], rgb)
+        ring.release()
+
+        results = (crop_hands if roi is not None and roi.current is not None else hands).process(rgb_frame)
+        found = results.multi_hand_landmarks[0] if results.multi_hand_landmarks else None
+        if roi is not None:
+            if found is not None:
+                roi.map_landmarks(found)
+            roi.update(found)
+        if found is not None:
+            points[:] = [(landmark.x, landmark.y, landmark.z) for landmark in found.landmark]
+        HEADER.pack_into(packet, 0, sequence, timestamp, time.perf_counter() - begin, found is not None)
+        conn.send_bytes(packet)
+
+    conn.send_bytes(b'')
+
+class Pipeline:
+    def __init__(self, source, opener, roi=None):
+        context = multiprocessing.get_context('spawn')
+        self.ring = SharedFrameRing(context)
+        self.stop_event = context.Event()
+        self.ready = context.Event()
+        self.capture_conn, capture_child = context.Pipe()
+        self.inference_conn, inference_child = context.Pipe()
+        self.capture = context.Process(
+            target=capture_worker, name="wrht-capture", daemon=True,
+            args=(self.ring, capture_child, self.stop_event, self.ready, source, opener))
+        self.inference = context.Process(
+            target=inference_worker, name="wrht-inference", daemon=True,
+            args=(self.ring, inference_child, self.stop_event, self.ready, roi))
+        self.shape = None
+
+    def start(self, timeout: float = 10.0) -> bool:
+        self.capture.start()
+        self.inference.start()
+        shape = self.capture_conn.recv() if self.capture_conn.poll(timeout) else None
+        if shape is None:
+            self.inference_conn.send(None)
+            return False
+        self.shape = shape
+        name = self.ring.allocate(shape)
+        self.capture_conn.send(name)
+        self.inference_conn.send((name, shape))
+        return True
+
+    def receive(self, buffer, timeout: float = 0.1):
+        if not self.inference_conn.poll(timeout):
+            return None if self.inference.is_alive() else 0
+        return self.inference_conn.recv_bytes_into(buffer)
+
+    def stop(self):
+        self.stop_event.set()
+        self.ring.close()
+        for process in (self.capture, self.inference):
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.ring.dispose()
+
+def run_pipeline(tracker, source, opener, roi=None, max_frames: int = 0):
+    pipeline = Pipeline(source, opener, roi)
+    if not pipeline.start():
+        pipeline.stop()
+        print(f"[-] Не удалось открыть источник {source}")
+        return None
+
+    buffer = bytearray(PACKET_SIZE)
+    points = np.ndarray((NUM_LANDMARKS, 3), np.float32, buffer=buffer, offset=HEADER.size)
+    frame = np.broadcast_to(np.uint8(0), pipeline.shape)
+    processed = 0
+    start = None
+    first_sequence = 0
+    tracker.startup.mark('tracking_start')
+    try:
+        while not tracker.stop_event.is_set() and (not max_frames or processed < max_frames):
+            received = pipeline.receive(buffer)
+            if received is None:
+                continue
+            if not received:
+                break
+
+            sequence, timestamp, inference, found = HEADER.unpack_from(buffer)
+            if start is None:
+                start, first_sequence = time.perf_counter(), sequence
+            else:
+                processed += 1
+            tracker.stats.add('inference', inference)
+            tracker.stats.set('dropped_frames', pipeline.ring.dropped.value)
+            hands = [LandmarkList(points)] if found else None
+            tracker.start_frame(timestamp)
+            tracker.handle_hands(frame, hands, timestamp)
+            if found:
+                tracker.stats.add('latency', time.monotonic() - timestamp)
+                if not tracker.startup.printed:
+                    tracker.startup.mark('first_cursor')
+                    tracker.startup.print()
+    finally:
+        elapsed = time.perf_counter() - start if start is not None else 0.0
+        captured = pipeline.ring.sequence.value - first_sequence
+        dropped = pipeline.ring.dropped.value
+        pipeline.stop()
+
+    print(f"[+] Пропущено кадров: {dropped} из {captured}")
+    return {'processed': processed, 'captured': captured, 'dropped': dropped, 'elapsed': elapsed}
+
+def add_pipeline_arguments(parser):
+    parser.add_argument('--pipeline', action='store_true',
+                        help="захват, распознавание и управление курсором в отдельных процессах")
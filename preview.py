@@ -0,0 +1,104 @@
+import signal
+import threading
+import time
+import cv2
+from metrics import StageStats
+
+class PreviewThread:
+    def __init__(self, stop_event: threading.Event, draw_landmarks, connections,
+                 fps: float = 10.0, scale: float = 0.5, mirror: bool = False, title: str = "Hand Tracking",
+                 release=None, stats: StageStats = None):
+        self.stop_event = stop_event
+        self.draw_landmarks = draw_landmarks
+        self.connections = connections
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.scale = scale
+        self.mirror = mirror
+        self.title = title
+        self.release = release or (lambda frame: None)
+        self.stats = stats or StageStats()
+        self.lock = threading.Lock()
+        self.frame = None
+        self.landmarks = None
+        self.thread = None
+        self.rendered_frames = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._loop, name="preview", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def submit(self, frame, landmarks=None):
+        with self.lock:
+            previous = self.frame
+            self.frame = frame
+            self.landmarks = landmarks
+        if previous is not None:
+            self.release(previous)
+
+    def _loop(self):
+        next_render = time.monotonic()
+        while not self.stop_event.is_set():
+            with self.lock:
+                frame, landmarks = self.frame, self.landmarks
+                self.frame = None
+
+            if frame is not None:
+                small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+                self.release(frame)
+                if self.mirror:
+                    small = cv2.flip(small, 1)
+                with self.stats.time('draw'):
+                    for hand_landmarks in landmarks or ():
+                        self.draw_landmarks(small, hand_landmarks, self.connections)
+                with self.stats.time('imshow'):
+                    cv2.imshow(self.title, small)
+                    key = cv2.waitKey(1)
+                self.rendered_frames += 1
+            else:
+                key = cv2.waitKey(1)
+
+            if key & 0xFF == ord('q'):
+                self.stop_event.set()
+                break
+
+            next_render += self.interval
+            delay = next_render - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_render = time.monotonic()
+
+        cv2.destroyWindow(self.title)
+
+def install_quit_handlers(stop_event: threading.Event, hotkey: str = 'ctrl+alt+q'):
+    def on_signal(signum, frame):
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, on_signal)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, on_signal)
+
+    try:
+        import keyboard
+        keyboard.add_hotkey(hotkey, stop_event.set)
+        return hotkey
+    except Exception:
+        return None
+
+def add_preview_arguments(parser):
+    parser.add_argument('--headless', action='store_true',
+                        help="без окна предпросмотра и отрисовки (выход: Ctrl+C или Ctrl+Alt+Q)")
+    parser.add_argument('--preview-fps', type=float, default=10.0, help="частота обновления предпросмотра")
+    parser.add_argument('--preview-scale', type=float, default=0.5, help="масштаб кадра предпросмотра")
+
+def preview_options(args):
+    return {
+        'headless': args.headless,
+        'preview_fps': args.preview_fps,
+        'preview_scale': args.preview_scale,
+    }
@@ -0,0 +1,183 @@
+import random
+import socket
+import struct
+import time
+from collections import deque
+import numpy as np
+from landmarks import NUM_LANDMARKS, LandmarkList, landmarks_to_array
+
+PACKET_MAGIC = b'WRHL'
+PACKET_VERSION = 1
+PACKET_HAND = 1
+HEADER = struct.Struct('<4sBBHIdd')
+PACKET_SIZE = HEADER.size + NUM_LANDMARKS * 3 * 2
+DEFAULT_PORT = 5005
+SEQUENCE_MASK = 0xFFFFFFFF
+
+def parse_address(text: str, default_host: str = '127.0.0.1'):
+    host, _, port = text.rpartition(':')
+    if not host and not port.isdigit():
+        host, port = port, ''
+    return host or default_host, int(port) if port else DEFAULT_PORT
+
+class LandmarkSender:
+    def __init__(self, address):
+        self.address = address
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.connect(address)
+        self.session = random.getrandbits(16)
+        self.sequence = 0
+        self.buffer = bytearray(PACKET_SIZE)
+        self.points = np.ndarray((NUM_LANDMARKS, 3), np.float16, buffer=self.buffer, offset=HEADER.size)
+        self.header = memoryview(self.buffer)[:HEADER.size]
+        self.packets = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def send(self, timestamp: float, hand_landmarks=None):
+        found = hand_landmarks is not None
+        if found:
+            landmarks_to_array(hand_landmarks, self.points)
+        self.sequence = (self.sequence + 1) & SEQUENCE_MASK
+        HEADER.pack_into(self.buffer, 0, PACKET_MAGIC, PACKET_VERSION, PACKET_HAND if found else 0,
+                         self.session, self.sequence, timestamp, time.monotonic())
+        try:
+            self.bytes += self.socket.send(self.buffer if found else self.header)
+            self.packets += 1
+        except OSError as e:
+            if not self.errors:
+                print(f"[-] Не удалось отправить точки на {self.address[0]}:{self.address[1]} ({e})")
+            self.errors += 1
+
+    def close(self):
+        if self.socket.fileno() < 0:
+            return
+        self.send(time.monotonic())
+        self.socket.close()
+        print(f"[+] Отправлено пакетов: {self.packets}, {self.bytes / 1024:.0f} КБ")
+
+class LandmarkReceiver:
+    def __init__(self, address, timeout: float = 0.5, window: int = 300):
+        self.address = address
+        self.timeout = timeout
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(address)
+        self.socket.settimeout(timeout)
+        self.buffer = bytearray(2048)
+        self.points = np.ndarray((NUM_LANDMARKS, 3), np.float16, buffer=self.buffer, offset=HEADER.size)
+        self.offsets = deque(maxlen=window)
+        self.source = None
+        self.session = None
+        self.sequence = None
+        self.last_packet = 0.0
+        self.offset = 0.0
+        self.delay = 0.0
+        self.received = 0
+        self.lost = 0
+        self.late = 0
+        self.ignored = 0
+
+    def connect(self, source, session: int):
+        if source != self.source:
+            print(f"[+] Источник точек: {source[0]}:{source[1]}")
+        self.source = source
+        self.session = session
+        self.sequence = None
+        self.offsets.clear()
+
+    def disconnect(self):
+        if self.source is not None:
+            print(f"[-] Нет пакетов от {self.source[0]}:{self.source[1]}")
+        self.source = None
+
+    def in_order(self, sequence: int) -> bool:
+        if self.sequence is None:
+            self.sequence = sequence
+            return True
+        gap = (sequence - self.sequence) & SEQUENCE_MASK
+        if gap == 0:
+            return False
+        if gap > SEQUENCE_MASK >> 1:
+            self.late += 1
+            self.lost = max(self.lost - 1, 0)
+            return False
+        self.lost += gap - 1
+        self.sequence = sequence
+        return True
+
+    def receive(self):
+        while True:
+            try:
+                size, source = self.socket.recvfrom_into(self.buffer)
+            except socket.timeout:
+                self.disconnect()
+                return None
+            received = time.monotonic()
+            if size < HEADER.size:
+                self.ignored += 1
+                continue
+            magic, version, flags, session, sequence, captured, sent = HEADER.unpack_from(self.buffer)
+            found = bool(flags & PACKET_HAND)
+            if magic != PACKET_MAGIC or version != PACKET_VERSION or (found and size < PACKET_SIZE):
+                self.ignored += 1
+                continue
+            if source != self.source or session != self.session:
+                if self.source is not None and source != self.source and received - self.last_packet < self.timeout:
+                    self.ignored += 1
+                    continue
+                self.connect(source, session)
+            if not self.in_order(sequence):
+                continue
+
+            self.offsets.append(received - sent)
+            self.offset = min(self.offsets)
+            self.delay = received - sent - self.offset
+            self.last_packet = received
+            self.received += 1
+            if not found:
+                return captured + self.offset, None
+            return captured + self.offset, LandmarkList(self.points.astype(np.float32))
+
+    def close(self):
+        self.socket.close()
+
+def run_receiver(tracker, receiver):
+    print(f"[+] Ожидание точек руки на {receiver.address[0]}:{receiver.address[1]}")
+    tracker.startup.mark('tracking_start')
+    visible = False
+    while not tracker.stop_event.is_set():
+        packet = receiver.receive()
+        tracker.stats.set('packets_lost', receiver.lost)
+        tracker.stats.set('packets_late', receiver.late)
+        tracker.stats.set('packets_ignored', receiver.ignored)
+        if packet is None:
+            if visible:
+                tracker.handle_hands(None, None, time.monotonic())
+                visible = False
+            continue
+
+        timestamp, hand = packet
+        visible = hand is not None
+        tracker.stats.add('network_delay', receiver.delay)
+        tracker.start_frame(timestamp)
+        tracker.handle_hands(None, [hand] if visible else None, timestamp)
+        if visible:
+            tracker.stats.add('latency', time.monotonic() - timestamp)
+            if not tracker.startup.printed:
+                tracker.startup.mark('first_cursor')
+                tracker.startup.print()
+    print(f"[+] Принято пакетов: {receiver.received}, потеряно: {receiver.lost}, не по порядку: {receiver.late}")
+
+def add_remote_arguments(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--send', metavar='HOST[:PORT]',
+                       help="передавать точки руки по UDP на другой компьютер вместо управления мышью здесь")
+    group.add_argument('--listen', metavar='[HOST:]PORT',
+                       help="принимать точки руки по UDP и управлять мышью здесь, без камеры; "
+                            "без HOST слушается только 127.0.0.1, для сети укажите адрес, например 0.0.0.0:5005")
+
+def remote_options(args):
+    return {
+        'sender': LandmarkSender(parse_address(args.send)) if args.send else None,
+        'receiver': LandmarkReceiver(parse_address(args.listen)) if args.listen else None,
+    }
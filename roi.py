@@ -0,0 +1,99 @@
+import cv2
+import numpy as np
+
+def crop_model(mediapipe, size: int):
+    hands = mediapipe.solutions.hands.Hands(
+        static_image_mode=True,
+        max_num_hands=1,
+        min_detection_confidence=0.7)
+    hands.process(np.zeros((size, size, 3), np.uint8))
+    return hands
+
+class RoiTracker:
+    def __init__(self, size: int = 256, padding: float = 0.5, search_width: int = 640, margin: float = 0.1):
+        self.size = size
+        self.padding = padding
+        self.search_width = search_width
+        self.margin = margin
+        self.box = None
+        self.current = None
+        self.frame_shape = None
+        self.crop = np.empty((size, size, 3), np.uint8)
+        self.rgb = np.empty((size, size, 3), np.uint8)
+        self.search = None
+        self.search_rgb = None
+
+    def reset(self):
+        self.box = None
+
+    def prepare(self, image):
+        height, width = image.shape[:2]
+        self.frame_shape = (height, width)
+
+        if self.box is None:
+            self.current = None
+            search_width = min(self.search_width, width)
+            search_height = round(height * search_width / width)
+            if self.search_rgb is None or self.search_rgb.shape[:2] != (search_height, search_width):
+                self.search = np.empty((search_height, search_width, 3), np.uint8)
+                self.search_rgb = np.empty_like(self.search)
+            if search_width == width:
+                cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self.search_rgb)
+            else:
+                cv2.resize(image, (search_width, search_height), dst=self.search, interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(self.search, cv2.COLOR_BGR2RGB, dst=self.search_rgb)
+            return self.search_rgb
+
+        self.current = self.box
+        x, y, side = self.box
+        cv2.resize(image[y:y + side, x:x + side], (self.size, self.size), dst=self.crop, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self.crop, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return self.rgb
+
+    def map_landmarks(self, hand_landmarks):
+        height, width = self.frame_shape
+        if self.current is None:
+            for landmark in hand_landmarks.landmark:
+                landmark.x = 1.0 - landmark.x
+            return
+
+        x, y, side = self.current
+        scale_x, scale_y = side / width, side / height
+        offset_x, offset_y = x / width, y / height
+        for landmark in hand_landmarks.landmark:
+            landmark.x = 1.0 - (offset_x + landmark.x * scale_x)
+            landmark.y = offset_y + landmark.y * scale_y
+            landmark.z *= scale_x
+
+    def update(self, hand_landmarks):
+        if hand_landmarks is None:
+            self.box = None
+            return
+
+        height, width = self.frame_shape
+        xs = [(1.0 - landmark.x) * width for landmark in hand_landmarks.landmark]
+        ys = [landmark.y * height for landmark in hand_landmarks.landmark]
+        left, right, top, bottom = min(xs), max(xs), min(ys), max(ys)
+
+        if self.box is not None:
+            x, y, side = self.box
+            inset = side * self.margin
+            span = max(right - left, bottom - top) * (1 + 2 * self.padding)
+            if (left > x + inset and right < x + side - inset and top > y + inset and bottom < y + side - inset
+                    and 0.7 * side < span < 1.3 * side):
+                return
+
+        side = int(max(right - left, bottom - top) * (1 + 2 * self.padding))
+        side = min(max(side, self.size // 2), width, height)
+        center_x, center_y = (left + right) / 2, (top + bottom) / 2
+        x = int(min(max(center_x - side / 2, 0), width - side))
+        y = int(min(max(center_y - side / 2, 0), height - side))
+        self.box = (x, y, side)
+
+def add_roi_arguments(parser):
+    parser.add_argument('--roi', action='store_true',
+                        help="распознавать руку в уменьшенной области вокруг прошлого положения")
+    parser.add_argument('--roi-size', type=int, default=256, help="размер области для модели, px")
+
+def roi_from_args(args):
+    return RoiTracker(args.roi_size) if args.roi else None
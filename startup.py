@@ -0,0 +1,80 @@
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupReport:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []
+        self.lock = threading.Lock()
+        self.printed = False
+
+    @contextmanager
+    def phase(self, name: str, background: bool = False):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                self.phases.append((name, begin - self.start, end - begin, background))
+
+    def mark(self, name: str):
+        with self.lock:
+            self.phases.append((name, time.perf_counter() - self.start, 0.0, False))
+
+    def print(self):
+        if self.printed:
+            return
+        self.printed = True
+        print("[+] Время запуска:")
+        with self.lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        for name, offset, duration, background in phases:
+            suffix = " (фон)" if background else ""
+            if duration:
+                print(f"  {name:16s} {offset * 1000:8.0f} мс  +{duration * 1000:.0f} мс{suffix}")
+            else:
+                print(f"  {name:16s} {offset * 1000:8.0f} мс")
+
+class ModelLoader:
+    def __init__(self, report: StartupReport = None, warmup_shape=(720, 1280, 3)):
+        self.report = report or StartupReport()
+        self.warmup_shape = warmup_shape
+        self.ready = threading.Event()
+        self.thread = None
+        self.error = None
+        self.mediapipe = None
+        self.hands = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._load, name="model-loader", daemon=True)
+            self.thread.start()
+        return self
+
+    def _load(self):
+        try:
+            with self.report.phase('model_import', background=True):
+                import mediapipe
+                import numpy as np
+            with self.report.phase('model_build', background=True):
+                hands = mediapipe.solutions.hands.Hands(
+                    max_num_hands=1,
+                    min_detection_confidence=0.7,
+                    min_tracking_confidence=0.7)
+            with self.report.phase('model_warmup', background=True):
+                hands.process(np.zeros(self.warmup_shape, np.uint8))
+            self.mediapipe, self.hands = mediapipe, hands
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+
+    def get(self):
+        self.start()
+        with self.report.phase('model_wait'):
+            self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        return self.mediapipe, self.hands
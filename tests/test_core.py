@@ -0,0 +1,184 @@
+import numpy as np
+import pytest
+from filters import DEFAULT_LEAD, MAX_LEAD, AverageFilter, KalmanFilter, OneEuroFilter, prediction_lead
+from gestures import GESTURE_PRESS, GESTURE_RELEASE, GESTURE_RIGHT_CLICK, GestureEngine
+from injection import BUTTON_LEFT, BUTTON_RIGHT, NullBackend
+from landmarks import NUM_LANDMARKS, HandLandmark, LandmarkList
+from remote import DEFAULT_PORT, LandmarkReceiver, LandmarkSender, parse_address
+
+class RecordingBackend(NullBackend):
+    def __init__(self, relative=False, pointer=None):
+        super().__init__(1920, 1080, relative)
+        self.pointer = pointer
+        self.calls = []
+
+    def pointer_position(self):
+        return self.pointer
+
+    def _move_absolute(self, x, y):
+        self.calls.append(('move', x, y))
+
+    def _move_relative(self, dx, dy):
+        self.calls.append(('relative', dx, dy))
+
+    def _button(self, button, pressed):
+        self.calls.append(('button', button, pressed))
+
+    def _scroll(self, steps):
+        self.calls.append(('scroll', steps))
+
+def test_absolute_move_skips_repeated_position():
+    backend = RecordingBackend()
+    backend.move(10.7, 20.2)
+    backend.move(10, 20)
+    backend.move(11, 20)
+    assert backend.calls == [('move', 10, 20), ('move', 11, 20)]
+    assert backend.events_sent == 2
+
+def test_relative_move_is_seeded_from_pointer():
+    backend = RecordingBackend(relative=True, pointer=(100, 100))
+    backend.move(110, 95)
+    backend.move(110, 95)
+    backend.move(100, 100)
+    assert backend.calls == [('relative', 10, -5), ('relative', -10, 5)]
+
+def test_relative_move_without_pointer_starts_at_first_target():
+    backend = RecordingBackend(relative=True)
+    backend.move(50, 50)
+    backend.move(53, 49)
+    assert backend.calls == [('relative', 3, -1)]
+
+def test_buttons_and_scroll():
+    backend = RecordingBackend()
+    backend.click(BUTTON_RIGHT)
+    backend.press(BUTTON_LEFT)
+    backend.release(BUTTON_LEFT)
+    backend.scroll(0)
+    backend.scroll(-2)
+    assert backend.calls == [('button', BUTTON_RIGHT, True), ('button', BUTTON_RIGHT, False),
+                             ('button', BUTTON_LEFT, True), ('button', BUTTON_LEFT, False), ('scroll', -2)]
+    assert backend.events_sent == 5
+
+def hand(thumb, index, middle=(0.7, 0.3)):
+    points = np.zeros((NUM_LANDMARKS, 3), np.float32)
+    points[:, :2] = (0.5, 0.8)
+    points[HandLandmark.MIDDLE_FINGER_MCP, :2] = (0.5, 0.6)
+    points[[HandLandmark.THUMB_TIP, HandLandmark.THUMB_IP], :2] = thumb
+    points[[HandLandmark.INDEX_FINGER_TIP, HandLandmark.INDEX_FINGER_PIP], :2] = index
+    points[[HandLandmark.MIDDLE_FINGER_TIP, HandLandmark.MIDDLE_FINGER_PIP], :2] = middle
+    return points
+
+OPEN = hand((0.3, 0.5), (0.5, 0.3))
+PINCH = hand((0.4, 0.5), (0.41, 0.5))
+HALF_OPEN = hand((0.4, 0.5), (0.44, 0.5))
+
+def test_pinch_presses_once_and_releases_with_hysteresis():
+    engine = GestureEngine(pinch_ratio=0.15, release_ratio=1.5)
+    assert engine.update(OPEN, 0.0) == 0
+    assert engine.update(PINCH, 0.1) == GESTURE_PRESS
+    assert engine.update(PINCH, 0.2) == 0
+    assert engine.update(HALF_OPEN, 0.3) == 0
+    assert engine.pinched
+    assert engine.update(OPEN, 0.4) == GESTURE_RELEASE
+    assert not engine.pinched
+
+def test_press_respects_cooldown():
+    engine = GestureEngine(cooldown=0.3)
+    engine.update(PINCH, 1.0)
+    engine.update(OPEN, 1.1)
+    assert engine.update(PINCH, 1.2) == 0
+    engine.update(OPEN, 1.3)
+    assert engine.update(PINCH, 1.4) == GESTURE_PRESS
+
+def test_thumb_to_middle_pinch_is_right_click():
+    engine = GestureEngine()
+    right = hand((0.4, 0.5), (0.5, 0.3), middle=(0.41, 0.5))
+    assert engine.update(right, 0.0) == GESTURE_RIGHT_CLICK
+    assert engine.update(right, 0.1) == 0
+
+def test_lost_hand_releases_held_pinch():
+    engine = GestureEngine()
+    engine.update(PINCH, 0.0)
+    assert engine.lost() == GESTURE_RELEASE
+    assert not engine.pinched
+    assert engine.lost() == 0
+
+def test_prediction_lead():
+    assert prediction_lead() == DEFAULT_LEAD
+    assert prediction_lead(0.05, 0.02) == 0.05
+    assert prediction_lead(measured=0.02) == 0.02
+    assert prediction_lead(measured=1.0) == MAX_LEAD
+    assert prediction_lead(measured=-0.01) == 0.0
+
+def test_average_filter_converges_to_constant_input():
+    cursor_filter = AverageFilter(window_size=4, smoothing=0.5)
+    cursor_filter.reset(0, 0)
+    for i in range(40):
+        x, y = cursor_filter.update(100, 200, i / 60)
+    assert (x, y) == pytest.approx((100, 200))
+
+@pytest.mark.parametrize('filter_class', [OneEuroFilter, KalmanFilter])
+def test_predictive_filters_hold_still_input(filter_class):
+    cursor_filter = filter_class()
+    cursor_filter.reset(500, 500)
+    assert cursor_filter.update(500, 500, 0.0) == (500, 500)
+    for i in range(1, 120):
+        x, y = cursor_filter.update(500, 500, i / 60)
+    assert (x, y) == pytest.approx((500, 500), abs=1e-6)
+
+@pytest.mark.parametrize('filter_class', [OneEuroFilter, KalmanFilter])
+def test_lead_extrapolates_along_velocity(filter_class):
+    still, ahead = filter_class(), filter_class()
+    for i in range(300):
+        t = i / 60
+        x, _ = still.update(100 * t, 0, t, lead=0.0)
+        lead_x, _ = ahead.update(100 * t, 0, t, lead=0.05)
+    assert lead_x - x == pytest.approx(100 * 0.05, rel=0.05)
+
+def test_parse_address():
+    assert parse_address('6000') == ('127.0.0.1', 6000)
+    assert parse_address('0.0.0.0:6000') == ('0.0.0.0', 6000)
+    assert parse_address('example.org') == ('example.org', DEFAULT_PORT)
+    assert parse_address('example.org:7', '0.0.0.0') == ('example.org', 7)
+
+@pytest.fixture
+def link():
+    receiver = LandmarkReceiver(('127.0.0.1', 0), timeout=0.5)
+    sender = LandmarkSender(receiver.socket.getsockname())
+    yield sender, receiver
+    sender.socket.close()
+    receiver.close()
+
+def test_packet_round_trip(link):
+    sender, receiver = link
+    points = np.random.default_rng(0).uniform(0, 1, (NUM_LANDMARKS, 3)).astype(np.float32)
+    sender.send(12.5, LandmarkList(points))
+    timestamp, received = receiver.receive()
+    assert received.array == pytest.approx(points, abs=1e-3)
+    assert timestamp == pytest.approx(12.5 + receiver.offset)
+
+    sender.send(13.0)
+    timestamp, received = receiver.receive()
+    assert received is None
+    assert receiver.received == 2 and receiver.lost == 0
+
+def test_garbage_packets_are_ignored(link):
+    sender, receiver = link
+    sender.socket.send(b'junk')
+    sender.socket.send(b'XXXX' + bytes(200))
+    sender.send(1.0)
+    assert receiver.receive() == (pytest.approx(1.0 + receiver.offset), None)
+    assert receiver.ignored == 2
+
+def test_sequence_counts_gaps_and_late_packets():
+    receiver = LandmarkReceiver(('127.0.0.1', 0))
+    try:
+        assert receiver.in_order(0xFFFFFFFE)
+        assert receiver.in_order(1)
+        assert receiver.lost == 2
+        assert not receiver.in_order(1)
+        assert not receiver.in_order(0)
+        assert receiver.late == 1 and receiver.lost == 1
+        assert receiver.in_order(2)
+    finally:
+        receiver.close()
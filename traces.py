@@ -0,0 +1,81 @@
+import json
+import struct
+import numpy as np
+from landmarks import NUM_LANDMARKS, landmarks_to_array
+
+TRACE_MAGIC = b'WRHTTRC1'
+TRACE_HEADER = struct.Struct('<8sHHI')
+TRACE_LABELED = 1
+RECORD = np.dtype([
+    ('timestamp', '<f8'),
+    ('found', 'u1'),
+    ('label', 'u1'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, 3)),
+])
+
+class TraceWriter:
+    def __init__(self, path: str, label_key: str = None):
+        self.path = path
+        self.label_key = label_key
+        self.keyboard = None
+        if label_key:
+            try:
+                import keyboard
+                keyboard.is_pressed(label_key)
+                self.keyboard = keyboard
+            except Exception as e:
+                print(f"[-] Метки кликов не записываются: клавиша {label_key} недоступна ({e})")
+        self.file = open(path, 'wb')
+        self.file.write(TRACE_HEADER.pack(TRACE_MAGIC, RECORD.itemsize, NUM_LANDMARKS,
+                                          TRACE_LABELED if self.keyboard is not None else 0))
+        self.record = np.zeros((), RECORD)
+        self.points = self.record['landmarks']
+        self.frames = 0
+
+    def label(self) -> bool:
+        return self.keyboard is not None and self.keyboard.is_pressed(self.label_key)
+
+    def write(self, timestamp: float, hand_landmarks=None):
+        self.record['timestamp'] = timestamp
+        self.record['found'] = hand_landmarks is not None
+        self.record['label'] = self.label()
+        if hand_landmarks is not None:
+            landmarks_to_array(hand_landmarks, self.points)
+        self.file.write(self.record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            print(f"[+] Трасса записана: {self.path}, кадров: {self.frames}")
+
+def load_trace(path: str):
+    with open(path, 'rb') as f:
+        header = f.read(TRACE_HEADER.size)
+    if len(header) < TRACE_HEADER.size:
+        raise ValueError(f"{path}: не трасса")
+    magic, itemsize, landmarks, flags = TRACE_HEADER.unpack(header)
+    if magic != TRACE_MAGIC or itemsize != RECORD.itemsize or landmarks != NUM_LANDMARKS:
+        raise ValueError(f"{path}: неподдерживаемый формат трассы")
+    records = np.memmap(path, RECORD, 'r', offset=TRACE_HEADER.size)
+    return records, bool(flags & TRACE_LABELED)
+
+def load_settings(path: str) -> dict:
+    with open(path) as f:
+        data = json.load(f)
+    return data.get('settings', data)
+
+def add_trace_arguments(parser):
+    parser.add_argument('--record-trace', metavar='FILE',
+                        help="записывать точки руки в бинарную трассу для tune.py")
+    parser.add_argument('--label-key', default='right ctrl',
+                        help="клавиша, которую держат во время задуманного клика (метка в трассе)")
+    parser.add_argument('--settings', metavar='FILE', help="параметры курсора и клика из tune.py")
+
+def trace_from_args(args, labels: bool = True):
+    if not args.record_trace:
+        return None
+    return TraceWriter(args.record_trace, args.label_key if labels else None)
+
+def settings_from_args(args):
+    return load_settings(args.settings) if args.settings else None
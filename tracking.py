@@ -0,0 +1,384 @@
+import cv2
+import numpy as np
+import threading
+import time
+from functools import partial
+from capture import CaptureThread, FramePool, flip_to_rgb, open_camera
+from landmarks import NUM_LANDMARKS, Results, landmarks_to_array
+from gestures import GESTURE_PRESS, GESTURE_RIGHT_CLICK, GESTURE_SCROLL, GESTURE_WAVE, GestureEngine
+from exposure import ExposureController, control_ranges
+from mapping import CursorMapping, MappingCalibration, Monitor, MonitorLayout
+from control import ControlScheduler
+from metrics import StageStats
+from filters import AverageFilter
+from roi import crop_model
+from preview import PreviewThread, install_quit_handlers
+from startup import ModelLoader, StartupReport
+from pipeline import run_pipeline
+from remote import run_receiver
+
+class HandTracking:
+    camera_api = cv2.CAP_ANY
+    camera_fourcc = None
+    camera_size = (1280, 720)
+    TUNABLE = ('SMOOTHING', 'window_size', 'FRAME_REDUCTION', 'CLICK_RATIO', 'CLICK_COOLDOWN')
+
+    def __init__(self, camera_index=0, mouse_mover=None, calibrate=True, cursor_filter=None,
+                 headless=False, preview_fps=10.0, preview_scale=0.5, model=None, startup=None, idle=None,
+                 roi=None, pipeline=False, flow=None, reuse_buffers=True, camera_fps=60, decode_scale=1,
+                 negotiate=True, landmarks_only=False, trace=None, settings=None, monitor='primary',
+                 calibration=None, calibrate_mapping=False, mapping_model='homography', acceleration=False,
+                 frame_budget=0.06, threaded_input=True, sender=None, receiver=None):
+        self.startup = startup or StartupReport()
+        self.camera_index = camera_index
+        self.camera_options = {'fps': camera_fps, 'decode_scale': decode_scale, 'negotiate': negotiate}
+        self.pipeline = pipeline
+        self.landmarks_only = pipeline or landmarks_only or receiver is not None
+        self.trace = trace
+        self.sender = sender
+        self.receiver = receiver
+        self.cap = None
+        self.capture = None
+        self.hands = None
+        self.crop_hands = None
+        self.preview = None
+        self.headless = headless or self.landmarks_only
+        if not self.landmarks_only:
+            model = (model or ModelLoader(self.startup)).start()
+            with self.startup.phase('camera_open'):
+                self.cap = self.open_camera(camera_index)
+
+        self.mouse_mover = mouse_mover or self.create_mouse_mover()
+        self.screen_width, self.screen_height = self.mouse_mover.screen_width, self.mouse_mover.screen_height
+        layout = getattr(self.mouse_mover, 'layout', None) or MonitorLayout(
+            [Monitor('screen', 0, 0, self.screen_width, self.screen_height, True)])
+        self.mapping = CursorMapping(layout, monitor, calibration=calibration, acceleration=acceleration)
+        self.calibration = MappingCalibration(self.mapping, mapping_model) if calibrate_mapping else None
+
+        self.FRAME_REDUCTION = 150
+        self.SMOOTHING = 0.9
+        self.CLICK_RATIO = 0.15
+        self.CLICK_COOLDOWN = 0.3
+        self.window_size = 8
+        target = self.mapping.monitor
+        self.prev_x = target.x + target.width / 2
+        self.prev_y = target.y + target.height / 2
+        self.custom_filter = cursor_filter
+        self.raw_cursor = (self.prev_x, self.prev_y)
+        self.is_clicking = False
+        self.hand_points = np.empty((NUM_LANDMARKS, 3), np.float32)
+        self.configure(**(settings or {}))
+
+        self.stats = StageStats()
+        self.scheduler = ControlScheduler(self.mouse_mover, self.stats, threaded_input)
+        self.frame_budget = frame_budget
+        self.frame_captured = None
+        self.frame_deadline = None
+        self.frame_late = False
+        self.lead = None
+        self.lead_frames = 0
+        self.stop_event = threading.Event()
+        self.idle = idle
+        self.roi = roi
+        self.flow = flow
+        self.pool = FramePool() if reuse_buffers else None
+        self.buffers = {}
+        if self.landmarks_only:
+            return
+        if flow is not None:
+            fps = self.cap.get(cv2.CAP_PROP_FPS)
+            flow.frame_interval = 1.0 / fps if fps > 0 else flow.frame_interval
+
+        self.exposure = ExposureController(ranges=control_ranges(camera_index)) if calibrate else None
+        self.capture = CaptureThread(self.cap, pool=self.pool, controller=self.exposure)
+
+        mediapipe, self.hands = model.get()
+        self.mediapipe_hands = mediapipe.solutions.hands
+        if roi is not None:
+            self.crop_hands = crop_model(mediapipe, roi.size)
+        self.mediapipe_draw = mediapipe.solutions.drawing_utils
+
+        if not self.headless:
+            self.preview = PreviewThread(self.stop_event, self.mediapipe_draw.draw_landmarks,
+                                         self.mediapipe_hands.HAND_CONNECTIONS, preview_fps, preview_scale,
+                                         mirror=True, release=self.capture.release, stats=self.stats)
+
+    def configure(self, **settings):
+        for name, value in settings.items():
+            if name not in self.TUNABLE:
+                raise ValueError(f"Неизвестный параметр: {name}")
+            setattr(self, name, value)
+        if self.custom_filter is not None and {'SMOOTHING', 'window_size'} & settings.keys():
+            print(f"[-] SMOOTHING и window_size не влияют на фильтр {self.custom_filter.name}")
+        self.cursor_filter = self.custom_filter or AverageFilter(self.window_size, self.SMOOTHING)
+        self.cursor_filter.reset(self.prev_x, self.prev_y)
+        self.gestures = GestureEngine(self.CLICK_RATIO, cooldown=self.CLICK_COOLDOWN)
+        self.mapping.set_margin(self.FRAME_REDUCTION / np.array(self.camera_size, float))
+
+    def settings(self) -> dict:
+        return {name: getattr(self, name) for name in self.TUNABLE}
+
+    def open_camera(self, camera_index):
+        return open_camera(camera_index, self.camera_api, self.camera_fourcc, *self.camera_size,
+                           **self.camera_options)
+
+    def create_mouse_mover(self):
+        raise NotImplementedError
+
+    def process_hand(self, frame, points, timestamp=0.0):
+        cursor_x, cursor_y = self.mapping.map(points, timestamp)
+        self.raw_cursor = (cursor_x, cursor_y)
+        smoothed_x, smoothed_y = self.cursor_filter.update(cursor_x, cursor_y, timestamp, self.prediction_lead())
+        return int(smoothed_x), int(smoothed_y)
+
+    def prediction_lead(self):
+        if self.frame_captured is None:
+            return None
+        self.lead_frames += 1
+        if self.lead is None or self.lead_frames >= 30:
+            histogram = self.stats.histograms.get('move_latency')
+            if histogram is not None and histogram.count:
+                self.lead = histogram.quantile(0.5)
+                self.lead_frames = 0
+        return self.lead if self.lead is not None else time.monotonic() - self.frame_captured
+
+    def update_cursor(self, x, y, is_clicking=False):
+        pass
+
+    def process_frame(self, image, timestamp, draw=True):
+        if self.flow is not None and not self.flow.due():
+            with self.stats.time('flow'):
+                propagated = self.flow.propagate(image)
+            if propagated is not None:
+                self.stats.count('flow_frames')
+                if self.roi is not None:
+                    self.roi.update(propagated)
+                frame = self.mirrored(image) if draw else image
+                results = Results([propagated])
+                self.handle_hands(frame, results.multi_hand_landmarks, timestamp, draw)
+                return frame, results
+
+        if self.roi is not None:
+            with self.stats.time('convert'):
+                rgb_frame = self.roi.prepare(image)
+        elif self.pool is not None:
+            with self.stats.time('convert'):
+                rgb_frame = flip_to_rgb(image, self.frame_buffer('rgb', image))
+        else:
+            with self.stats.time('flip'):
+                flipped = cv2.flip(image, 1)
+            with self.stats.time('convert'):
+                rgb_frame = cv2.cvtColor(flipped, cv2.COLOR_BGR2RGB)
+        hands = self.crop_hands if self.roi is not None and self.roi.current is not None else self.hands
+        with self.stats.time('inference') as timer:
+            results = hands.process(rgb_frame)
+        inference_time = time.perf_counter() - timer.start
+
+        if self.roi is not None:
+            with self.stats.time('roi'):
+                for hand_landmarks in results.multi_hand_landmarks or ():
+                    self.roi.map_landmarks(hand_landmarks)
+                self.roi.update(results.multi_hand_landmarks[0] if results.multi_hand_landmarks else None)
+
+        if self.flow is not None:
+            with self.stats.time('flow_keyframe'):
+                if results.multi_hand_landmarks:
+                    score = results.multi_handedness[0].classification[0].score
+                    self.flow.keyframe(image, results.multi_hand_landmarks[0], score, inference_time)
+                else:
+                    self.flow.keyframe(image, None, 0.0, inference_time)
+
+        frame = self.mirrored(image) if draw else image
+        self.handle_hands(frame, results.multi_hand_landmarks, timestamp, draw)
+        return frame, results
+
+    def frame_buffer(self, name, image):
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != image.shape:
+            buffer = self.buffers[name] = np.empty_like(image)
+        return buffer
+
+    def mirrored(self, image):
+        if self.pool is None:
+            return cv2.flip(image, 1)
+        return cv2.flip(image, 1, dst=self.frame_buffer('mirrored', image))
+
+    def handle_hands(self, frame, multi_hand_landmarks, timestamp, draw=False):
+        self.stats.count('frames')
+        if self.trace is not None:
+            self.trace.write(timestamp, multi_hand_landmarks[0] if multi_hand_landmarks else None)
+        if self.sender is not None:
+            with self.stats.time('send'):
+                self.sender.send(timestamp, multi_hand_landmarks[0] if multi_hand_landmarks else None)
+            return
+        origin = self.frame_captured if self.frame_captured is not None else time.monotonic()
+        if not multi_hand_landmarks:
+            self.scheduler.submit(self.gestures.lost(), 0, origin)
+            self.mapping.reset()
+            self.is_clicking = False
+            return
+
+        self.stats.count('detections')
+        with self.stats.time('gestures'):
+            landmarks_to_array(multi_hand_landmarks[0], self.hand_points)
+            events = self.gestures.update(self.hand_points, timestamp)
+            self.is_clicking = self.gestures.pinched
+        if self.calibration is not None:
+            if self.calibration.update(self.hand_points, events):
+                self.calibration = None
+            return
+        if events:
+            self.apply_gestures(events, origin)
+
+        with self.stats.time('process_hand'):
+            cursor_x, cursor_y = self.process_hand(frame, self.hand_points, timestamp)
+            self.prev_x, self.prev_y = cursor_x, cursor_y
+        if not self.gestures.scrolling:
+            self.scheduler.move(cursor_x, cursor_y, origin)
+
+        if self.deadline_missed():
+            return
+        if draw:
+            with self.stats.time('draw'):
+                for hand_landmarks in multi_hand_landmarks:
+                    self.mediapipe_draw.draw_landmarks(
+                        frame,
+                        hand_landmarks,
+                        self.mediapipe_hands.HAND_CONNECTIONS
+                    )
+        self.update_cursor(cursor_x, cursor_y, self.is_clicking)
+
+    def start_frame(self, captured: float):
+        self.frame_captured = captured
+        self.frame_deadline = captured + self.frame_budget
+        self.frame_late = False
+
+    def deadline_missed(self) -> bool:
+        if self.frame_deadline is None:
+            return False
+        if not self.frame_late and time.monotonic() > self.frame_deadline:
+            self.frame_late = True
+            self.stats.count('deadline_misses')
+        return self.frame_late
+
+    def apply_gestures(self, events, origin=None):
+        self.scheduler.submit(events, self.gestures.scroll_steps,
+                              origin if origin is not None else time.monotonic())
+        if events & GESTURE_PRESS:
+            self.stats.count('clicks')
+        if events & GESTURE_RIGHT_CLICK:
+            self.stats.count('right_clicks')
+        if events & GESTURE_SCROLL:
+            self.stats.count('scrolls')
+        if events & GESTURE_WAVE:
+            self.stats.count('waves')
+            self.open_panel()
+
+    def open_panel(self):
+        pass
+
+    def set_idle(self, active):
+        self.idle.active = active
+        self.capture.set_stride(self.idle.stride if active else 1)
+        self.stats.set('idle', int(active))
+        self.stats.count('idle_enter' if active else 'idle_wake')
+        if self.roi is not None:
+            self.roi.reset()
+        if self.flow is not None:
+            self.flow.reset()
+
+    def step(self, image, timestamp, draw=False):
+        if self.idle is not None and self.idle.active:
+            with self.stats.time('motion'):
+                moving = self.idle.motion(image)
+            if not moving:
+                self.stats.count('idle_frames')
+                return None
+            self.set_idle(False)
+
+        frame, results = self.process_frame(image, timestamp, draw)
+        if self.idle is not None and self.idle.update(bool(results.multi_hand_landmarks), image):
+            self.set_idle(True)
+        return frame, results
+
+    def cleanup(self):
+        self.scheduler.stop()
+        if self.gestures.pinched:
+            self.mouse_mover.release()
+        if self.capture is not None:
+            self.capture.stop()
+        if self.cap is not None:
+            self.cap.release()
+        self.mouse_mover.close()
+        if self.trace is not None:
+            self.trace.close()
+        if self.sender is not None:
+            self.sender.close()
+        if self.receiver is not None:
+            self.receiver.close()
+
+    def run(self):
+        hotkey = install_quit_handlers(self.stop_event)
+        print("\n[+] Управление:")
+        print("- Перемещение курсора: движение среднего пальца")
+        print("- Клик: соединить большой и указательный пальцы, удерживать для перетаскивания")
+        print("- Правый клик: соединить большой и средний пальцы")
+        print("- Прокрутка: указательный и средний пальцы вытянуты, двигать руку вверх-вниз")
+        print("- Панель: помахать открытой ладонью")
+        if self.preview is not None:
+            print("- Выход: нажмите 'q' в окне предпросмотра")
+        print("- Выход: Ctrl+C" + (f" или {hotkey}" if hotkey else "") + "\n")
+
+        if self.calibration is not None:
+            self.calibration.start()
+        self.scheduler.start()
+        if self.receiver is not None:
+            run_receiver(self, self.receiver)
+            self.cleanup()
+            return
+        if self.pipeline:
+            run_pipeline(self, self.camera_index,
+                         partial(open_camera, api=self.camera_api, fourcc=self.camera_fourcc,
+                                 width=self.camera_size[0], height=self.camera_size[1], **self.camera_options),
+                         self.roi)
+            self.cleanup()
+            return
+
+        if self.preview is not None:
+            self.preview.start()
+        self.capture.start()
+        self.startup.mark('tracking_start')
+        while not self.stop_event.is_set():
+            with self.stats.time('capture'):
+                captured = self.capture.read()
+            if captured is None:
+                continue
+
+            self.start_frame(captured.timestamp)
+            processed = self.step(captured.image, captured.timestamp)
+            self.stats.set('dropped_frames', self.capture.dropped_frames)
+            if self.capture.measured_fps is not None:
+                self.stats.set('camera_fps', self.capture.measured_fps)
+            if self.exposure is not None and self.exposure.luminance is not None:
+                self.stats.set('luminance', self.exposure.luminance)
+            if processed is None:
+                self.capture.release(captured.image)
+                continue
+
+            frame, results = processed
+            if results.multi_hand_landmarks:
+                self.stats.add('latency', time.monotonic() - captured.timestamp)
+                if not self.startup.printed:
+                    self.startup.mark('first_cursor')
+                    self.startup.print()
+
+            if self.preview is not None and not self.deadline_missed():
+                self.preview.submit(frame, results.multi_hand_landmarks)
+            else:
+                self.capture.release(frame)
+
+        self.stop_event.set()
+        if self.preview is not None:
+            self.preview.stop()
+        print(f"[+] Пропущено кадров: {self.capture.dropped_frames} из {self.capture.captured_frames}")
+        self.cleanup()
@@ -0,0 +1,161 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from injection import NullMouseMover
+from filters import score_track
+from gestures import GESTURE_PRESS
+from landmarks import LandmarkList
+from traces import load_trace
+from tracking import HandTracking
+
+GRID = {
+    'SMOOTHING': [0.5, 0.7, 0.8, 0.9, 0.95],
+    'window_size': [2, 4, 8, 12],
+    'FRAME_REDUCTION': [50, 100, 150, 200],
+    'CLICK_RATIO': [0.1, 0.15, 0.2, 0.25],
+    'CLICK_COOLDOWN': [0.1, 0.2, 0.3, 0.5],
+}
+WEIGHTS = {'lag_ms': 0.05, 'jitter_px': 1.0, 'missed_clicks': 5.0, 'false_clicks': 5.0, 'unreached': 10.0}
+CLICK_TOLERANCE = 0.3
+
+class TraceTracking(HandTracking):
+    def __init__(self, settings=None, screen_size=(1920, 1080)):
+        self.presses = []
+        super().__init__(mouse_mover=NullMouseMover(*screen_size), landmarks_only=True, settings=settings)
+
+    def apply_gestures(self, events, origin=None):
+        if events & GESTURE_PRESS:
+            self.presses.append(self.gestures.last_press)
+        super().apply_gestures(events, origin)
+
+def match_clicks(expected, detected, tolerance: float = CLICK_TOLERANCE):
+    used = [False] * len(detected)
+    delays = []
+    for moment in expected:
+        for i, pressed in enumerate(detected):
+            if not used[i] and abs(pressed - moment) <= tolerance:
+                used[i] = True
+                delays.append(pressed - moment)
+                break
+    return len(expected) - len(delays), used.count(False), delays
+
+def score_trace(records, labeled: bool, settings: dict, screen_size=(1920, 1080)):
+    tracker = TraceTracking(settings, screen_size)
+    timestamps = records['timestamp']
+    found = records['found'].astype(bool)
+    landmarks = records['landmarks']
+    raw = np.empty((int(found.sum()), 2))
+    output = np.empty_like(raw)
+    row = 0
+    for i in range(len(records)):
+        hands = [LandmarkList(landmarks[i])] if found[i] else None
+        tracker.handle_hands(None, hands, float(timestamps[i]))
+        if hands:
+            raw[row] = tracker.raw_cursor
+            output[row] = tracker.prev_x, tracker.prev_y
+            row += 1
+
+    if row >= 3:
+        result = score_track(output, timestamps[found], raw)
+        low, high = np.percentile(raw, [1, 99], axis=0)
+        result['unreached'] = float(1 - np.min((high - low) / np.asarray(screen_size, float)))
+    else:
+        result = {'lag_ms': 0.0, 'jitter_px': 0.0, 'error_px': 0.0, 'unreached': 1.0}
+    result['frames'] = row
+
+    result['missed_clicks'] = result['false_clicks'] = 0
+    result['click_delay_ms'] = None
+    if labeled:
+        label = records['label'].astype(bool)
+        expected = timestamps[1:][label[1:] & ~label[:-1]].tolist()
+        if len(label) and label[0]:
+            expected.insert(0, float(timestamps[0]))
+        missed, false, delays = match_clicks(expected, tracker.presses)
+        result.update(missed_clicks=missed, false_clicks=false,
+                      click_delay_ms=float(np.mean(delays)) * 1000 if delays else None)
+    return result
+
+def combine(results):
+    frames = sum(result['frames'] for result in results) or 1
+    combined = {name: sum(result[name] * result['frames'] for result in results) / frames
+                for name in ('lag_ms', 'jitter_px', 'error_px', 'unreached')}
+    combined['missed_clicks'] = sum(result['missed_clicks'] for result in results)
+    combined['false_clicks'] = sum(result['false_clicks'] for result in results)
+    combined['cost'] = sum(weight * combined[name] for name, weight in WEIGHTS.items())
+    return combined
+
+WORKER = {}
+
+def load_traces(paths, screen_size):
+    WORKER['traces'] = [load_trace(path) for path in paths]
+    WORKER['screen_size'] = screen_size
+
+def evaluate(settings: dict):
+    return settings, combine([score_trace(records, labeled, settings, WORKER['screen_size'])
+                              for records, labeled in WORKER['traces']])
+
+def candidates(samples: int = 0, seed: int = 0):
+    names = list(GRID)
+    grid = [dict(zip(names, values)) for values in itertools.product(*GRID.values())]
+    if samples and samples < len(grid):
+        grid = random.Random(seed).sample(grid, samples)
+    return grid
+
+def tune(paths, samples: int = 0, workers: int = None, seed: int = 0, screen_size=(1920, 1080)):
+    baseline = TraceTracking(screen_size=screen_size).settings()
+    settings = [baseline] + [candidate for candidate in candidates(samples, seed) if candidate != baseline]
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_traces, initargs=(paths, screen_size)) as pool:
+        chunk = max(1, len(settings) // ((workers or os.cpu_count() or 1) * 4))
+        results = list(pool.map(evaluate, settings, chunksize=chunk))
+    return results[0], sorted(results, key=lambda result: result[1]['cost'])
+
+def print_results(baseline, ranked, top: int):
+    names = list(GRID)
+    print(" ".join(f"{name:>15s}" for name in names) +
+          f" {'задержка, мс':>13s} {'дрожание, px':>13s} {'пропуск':>8s} {'ложные':>7s} {'стоимость':>10s}")
+    shown = ranked[:top] + ([] if baseline in ranked[:top] else [baseline])
+    for entry in shown:
+        settings, result = entry
+        print(" ".join(f"{settings[name]:>15g}" for name in names) +
+              f" {result['lag_ms']:13.1f} {result['jitter_px']:13.2f} {result['missed_clicks']:8d} "
+              f"{result['false_clicks']:7d} {result['cost']:10.2f}" + ("  (текущие)" if entry is baseline else ""))
+
+def main():
+    parser = argparse.ArgumentParser(description="Подбор параметров курсора и клика по записанным трассам")
+    parser.add_argument('traces', nargs='+', help="файлы трасс, записанные с --record-trace")
+    parser.add_argument('--random', type=int, default=0, metavar='N',
+                        help="проверить N случайных точек сетки вместо всей сетки")
+    parser.add_argument('--workers', type=int, default=None, help="число процессов (по умолчанию все ядра)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--screen', default='1920x1080', help="размер экрана, ШxВ")
+    parser.add_argument('--top', type=int, default=5, help="сколько лучших вариантов показать")
+    parser.add_argument('--output', help="сохранить лучшие параметры в JSON для --settings")
+    args = parser.parse_args()
+
+    screen_size = tuple(int(value) for value in args.screen.lower().split('x'))
+    for path in args.traces:
+        records, labeled = load_trace(path)
+        print(f"[+] {path}: {len(records)} кадров, рука на {np.count_nonzero(records['found'])}, "
+              f"кликов размечено: {int(np.count_nonzero(np.diff(records['label'].astype(np.int8)) > 0))}"
+              + ("" if labeled else " (без меток кликов)"))
+
+    start = time.perf_counter()
+    baseline, ranked = tune(args.traces, args.random, args.workers, args.seed, screen_size)
+    elapsed = time.perf_counter() - start
+    print(f"[+] Проверено вариантов: {len(ranked)} за {elapsed:.1f} с "
+          f"({elapsed / len(ranked) * 1000:.0f} мс на вариант)\n")
+    print_results(baseline, ranked, args.top)
+
+    if args.output:
+        best, result = ranked[0]
+        with open(args.output, 'w') as f:
+            json.dump({'settings': best, 'metrics': result}, f, ensure_ascii=False, indent=2)
+        print(f"\n[+] Лучшие параметры сохранены в {args.output}")
+
+if __name__ == "__main__":
+    main()
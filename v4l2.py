@@ -0,0 +1,123 @@
+import os
+import struct
+import sys
+from typing import List, NamedTuple, Optional, Tuple
+
+VIDIOC_ENUM_FMT = 0xC0405602
+VIDIOC_ENUM_FRAMESIZES = 0xC02C564A
+VIDIOC_ENUM_FRAMEINTERVALS = 0xC034564B
+VIDIOC_QUERYCTRL = 0xC0445624
+V4L2_CID_BRIGHTNESS = 0x00980900
+V4L2_CID_CONTRAST = 0x00980901
+V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
+V4L2_FRMSIZE_TYPE_DISCRETE = 1
+V4L2_FRMIVAL_TYPE_DISCRETE = 1
+
+FMTDESC = struct.Struct('<III32sII12x')
+FRMSIZE = struct.Struct('<III6I8x')
+FRMIVAL = struct.Struct('<IIIII6I8x')
+QUERYCTRL = struct.Struct('<II32siiiiI8x')
+
+DECODABLE = {'YUYV', 'UYVY', 'YVYU', 'NV12', 'NV21', 'YU12', 'YV12', 'BGR3', 'RGB3', 'GREY', 'MJPG', 'JPEG'}
+COMPRESSED = {'MJPG', 'JPEG'}
+
+class CameraMode(NamedTuple):
+    fourcc: str
+    width: int
+    height: int
+    fps: float
+
+    @property
+    def compressed(self) -> bool:
+        return self.fourcc in COMPRESSED
+
+    def __str__(self):
+        return f"{self.fourcc} {self.width}x{self.height} @ {self.fps:g} FPS"
+
+def fourcc_name(code: int) -> str:
+    return int(code).to_bytes(4, 'little').decode('ascii', 'replace').rstrip('\0 ')
+
+def device_path(camera_index) -> Optional[str]:
+    if not sys.platform.startswith('linux') or not isinstance(camera_index, int):
+        return None
+    path = f'/dev/video{camera_index}'
+    return path if os.path.exists(path) else None
+
+def enumerate_ioctl(fd, request, layout, *fields):
+    import fcntl
+    header = struct.Struct(f'<{1 + len(fields)}I')
+    index = 0
+    while True:
+        buffer = bytearray(layout.size)
+        header.pack_into(buffer, 0, index, *fields)
+        try:
+            fcntl.ioctl(fd, request, buffer)
+        except OSError:
+            return
+        yield layout.unpack(buffer)
+        index += 1
+
+def frame_sizes(fd, pixelformat: int, width: int, height: int):
+    for _, _, kind, *size in enumerate_ioctl(fd, VIDIOC_ENUM_FRAMESIZES, FRMSIZE, pixelformat):
+        if kind == V4L2_FRMSIZE_TYPE_DISCRETE:
+            yield size[0], size[1]
+            continue
+        min_width, max_width, step_width, min_height, max_height, step_height = size
+        for w, h in ((width, height), (max_width, max_height)):
+            w = min(max(w, min_width), max_width)
+            h = min(max(h, min_height), max_height)
+            yield w - (w - min_width) % max(step_width, 1), h - (h - min_height) % max(step_height, 1)
+        return
+
+def frame_rates(fd, pixelformat: int, width: int, height: int):
+    for *_, kind, numerator, denominator, _, _, _, _ in enumerate_ioctl(
+            fd, VIDIOC_ENUM_FRAMEINTERVALS, FRMIVAL, pixelformat, width, height):
+        if numerator:
+            yield denominator / numerator
+        if kind != V4L2_FRMIVAL_TYPE_DISCRETE:
+            return
+
+def list_modes(path: str, width: int = 1280, height: int = 720) -> List[CameraMode]:
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        return []
+    modes = []
+    try:
+        for _, _, _, _, pixelformat, _ in enumerate_ioctl(fd, VIDIOC_ENUM_FMT, FMTDESC, V4L2_BUF_TYPE_VIDEO_CAPTURE):
+            fourcc = fourcc_name(pixelformat)
+            if fourcc not in DECODABLE:
+                continue
+            for size in sorted(set(frame_sizes(fd, pixelformat, width, height))):
+                modes.extend(CameraMode(fourcc, *size, round(fps, 2))
+                             for fps in set(frame_rates(fd, pixelformat, *size)))
+    finally:
+        os.close(fd)
+    return modes
+
+def control_range(path: str, control: int) -> Optional[Tuple[int, int]]:
+    import fcntl
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        return None
+    buffer = bytearray(QUERYCTRL.size)
+    struct.pack_into('<I', buffer, 0, control)
+    try:
+        fcntl.ioctl(fd, VIDIOC_QUERYCTRL, buffer)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    _, _, _, minimum, maximum, _, _, _ = QUERYCTRL.unpack(buffer)
+    return minimum, maximum
+
+def choose_mode(modes: List[CameraMode], width: int = 1280, height: int = 720, fps: float = 60,
+                min_width: int = 640) -> Optional[CameraMode]:
+    usable = [mode for mode in modes if min_width <= mode.width <= width and mode.height <= height] or modes
+    if not usable:
+        return None
+    fast = [mode for mode in usable if mode.fps >= fps * 0.98]
+    if fast:
+        return min(fast, key=lambda mode: (-mode.fps, mode.width * mode.height, mode.compressed))
+    return min(usable, key=lambda mode: (-mode.fps, -mode.width * mode.height, mode.compressed))